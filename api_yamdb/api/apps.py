@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from reviews.models import post_soft_delete
+        from . import signals  # noqa: F401
+        from .snapshots import category_snapshot, genre_snapshot
+
+        for snapshot in (category_snapshot, genre_snapshot):
+            for signal in (post_save, post_delete, post_soft_delete):
+                signal.connect(snapshot.bump_on_commit,
+                               sender=snapshot.model,
+                               dispatch_uid=snapshot.version_key)
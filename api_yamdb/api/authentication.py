@@ -0,0 +1,172 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed, InvalidToken, TokenError)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .revocation import (consume_token, record_tokens, revoke_user_tokens,
+                         revoked_tokens)
+from .signals import user_version_key
+from .versions import get_collection_version
+
+User = get_user_model()
+
+# Поля пользователя, которых достаточно для проверки прав доступа.
+USER_FIELDS = ('id', 'username', 'role', 'is_superuser', 'is_active')
+# Утверждения токена с полями пользователя и версией, на которой они
+# были выписаны.
+USER_CLAIMS = ('username', 'role', 'is_superuser')
+VERSION_CLAIM = 'user_version'
+
+USER_CACHE_SIZE = 1024
+USER_CACHE_TTL = 300
+
+
+def get_user_version(user_id):
+    version, _ = get_collection_version(user_version_key(user_id))
+    return version
+
+
+def tokens_for(user):
+    """Выписывает токены доступа и обновления с ролью пользователя.
+
+    Токены записываются в таблицу выданных, чтобы их можно было отозвать.
+    """
+    refresh = RefreshToken.for_user(user)
+    for claim in USER_CLAIMS:
+        refresh[claim] = getattr(user, claim)
+    refresh[VERSION_CLAIM] = get_user_version(user.pk)
+    # Утверждения токена обновления копируются в токен доступа.
+    access = refresh.access_token
+    record_tokens(user, access, refresh)
+    return access, refresh
+
+
+def get_refresh_token(raw_token):
+    try:
+        return RefreshToken(raw_token)
+    except TokenError as error:
+        raise InvalidToken(error.args[0])
+
+
+def rotate_refresh_token(raw_token):
+    """Погашает токен обновления и выдаёт новую пару токенов.
+
+    Нужны только проверка подписи и один условный запрос: пользователь
+    собирается из утверждений токена, если его версия не менялась.
+    Повторное использование токена отзывает все токены пользователя.
+    """
+    refresh = get_refresh_token(raw_token)
+    user = CachedJWTAuthentication().get_user(refresh)
+    with transaction.atomic():
+        if consume_token(refresh):
+            return tokens_for(user)
+    # Повторно предъявленный токен мог быть украден: отзываются все
+    # токены пользователя, включая выданные по этому токену раньше.
+    revoke_user_tokens(user.pk)
+    raise InvalidToken(_('Token is blacklisted'))
+
+
+def build_user(fields):
+    """Облегчённый пользователь: остальные поля отложены и читаются из
+    базы только при обращении к ним."""
+    # from_db ожидает значения в порядке полей модели.
+    names = [
+        field.attname for field in User._meta.concrete_fields
+        if field.attname in fields
+    ]
+    return User.from_db(
+        DEFAULT_DB_ALIAS, names, [fields[name] for name in names])
+
+
+class UserCache:
+    """Ограниченный LRU-кэш полей пользователей в памяти процесса.
+
+    Запись действительна, пока не истёк её срок и не изменилась версия
+    пользователя в общем кэше, поэтому смена роли в одном воркере
+    сбрасывает записи во всех остальных.
+    """
+
+    def __init__(self, max_size=USER_CACHE_SIZE, ttl=USER_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+
+    def get(self, user_id, version):
+        with self._lock:
+            item = self._items.get(user_id)
+            if item is None:
+                return None
+            item_version, expires, fields = item
+            if item_version != version or expires < time.monotonic():
+                del self._items[user_id]
+                return None
+            self._items.move_to_end(user_id)
+            return fields
+
+    def set(self, user_id, version, fields):
+        with self._lock:
+            self._items[user_id] = (
+                version, time.monotonic() + self.ttl, fields)
+            self._items.move_to_end(user_id)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация, которой обычно не нужен запрос к базе.
+
+    Если версия пользователя в токене совпадает с текущей, пользователь
+    собирается из утверждений токена. Иначе поля берутся из кэша
+    процесса, а при промахе - одним запросом к базе. Отозванные токены
+    отсеиваются фильтром Блума, которому база нужна только при
+    положительном ответе.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        jti = validated_token.get(api_settings.JTI_CLAIM)
+        if jti and jti in revoked_tokens:
+            raise InvalidToken(_('Token is blacklisted'))
+        return validated_token
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+        version = get_user_version(user_id)
+        if validated_token.get(VERSION_CLAIM) == version and all(
+                claim in validated_token for claim in USER_CLAIMS):
+            return build_user({
+                'id': user_id, 'is_active': True,
+                **{claim: validated_token[claim] for claim in USER_CLAIMS},
+            })
+
+        fields = user_cache.get(user_id, version)
+        if fields is None:
+            fields = User.objects.filter(pk=user_id).values(
+                *USER_FIELDS).first()
+            if fields is None:
+                raise AuthenticationFailed(
+                    _('User not found'), code='user_not_found')
+            user_cache.set(user_id, version, fields)
+        user = build_user(fields)
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive')
+        return user
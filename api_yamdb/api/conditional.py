@@ -0,0 +1,72 @@
+import hashlib
+import math
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.generics import get_object_or_404
+
+from .versions import get_collection_version
+
+
+class ConditionalGetMixin:
+    """Отвечает 304 на условные GET-запросы до сериализации.
+
+    Валидаторы строятся из версии коллекции, которую возвращает
+    ``get_version_key``: ETag зависит от версии и строки запроса,
+    Last-Modified - от времени последнего изменения коллекции.
+    """
+
+    # Поля, которых достаточно для проверки объекта до условного ответа.
+    conditional_object_fields = ('pk',)
+
+    def get_version_key(self):
+        raise NotImplementedError
+
+    def get_validators(self, request):
+        token, modified = get_collection_version(self.get_version_key())
+        digest = hashlib.sha1(
+            f'{token}:{request.get_full_path()}'.encode()).hexdigest()
+        # Last-Modified передаётся с точностью до секунды; округление вверх
+        # не даёт изменению внутри секунды выглядеть старее If-Modified-Since.
+        return f'"{digest}"', math.ceil(modified)
+
+    def conditional(self, handler, request, *args, **kwargs):
+        # Родительские объекты проверяются до сравнения валидаторов, чтобы
+        # для несуществующего объекта ответом был 404, а не 304.
+        get_parents = getattr(self, 'get_parents', None)
+        if get_parents is not None:
+            get_parents()
+        etag, last_modified = self.get_validators(request)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response.headers['ETag'] = etag
+            response.headers['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def check_object(self):
+        """Проверяет наличие объекта и права на него облегчённым запросом.
+
+        Выборка представления без связанных объектов и с одним первичным
+        ключом: полный объект загружается, только если ответ не 304.
+        """
+        queryset = self.filter_queryset(self.get_queryset()).select_related(
+            None).prefetch_related(None).only(
+                *self.conditional_object_fields)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        obj = get_object_or_404(
+            queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        self.check_object_permissions(self.request, obj)
+
+    def retrieve(self, request, *args, **kwargs):
+        # Без условных заголовков ответ 304 невозможен, и объект сразу
+        # загружается целиком.
+        if ('If-None-Match' in request.headers
+                or 'If-Modified-Since' in request.headers):
+            self.check_object()
+        return self.conditional(super().retrieve, request, *args, **kwargs)
@@ -1,13 +1,26 @@
 from django_filters import rest_framework
 from reviews.models import Title
+from reviews.search import search_titles
 
 
 class TitleFilter(rest_framework.FilterSet):
     name = rest_framework.CharFilter(field_name='name',
                                      lookup_expr='icontains')
-    genre = rest_framework.CharFilter(field_name='genre__slug')
-    category = rest_framework.CharFilter(field_name='category__slug')
+    genre = rest_framework.CharFilter(method='filter_genre')
+    category = rest_framework.CharFilter(method='filter_category')
+    search = rest_framework.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ('name', 'category', 'genre', 'year')
+        fields = ('name', 'category', 'genre', 'year', 'search')
+
+    def filter_genre(self, queryset, name, value):
+        return queryset.filter(genre__slug=value,
+                               genre__deleted_at__isnull=True)
+
+    def filter_category(self, queryset, name, value):
+        return queryset.filter(category__slug=value,
+                               category__deleted_at__isnull=True)
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
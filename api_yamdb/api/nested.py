@@ -0,0 +1,41 @@
+from django.shortcuts import get_object_or_404
+
+from reviews.models import Review, Title
+
+
+def resolve_parents(request, kwargs):
+    """Находит родительские объекты вложенного URL одним запросом.
+
+    Цепочка title -> review проверяется целиком: отзыв ищется вместе с
+    произведением по обоим идентификаторам, поэтому комментарии к
+    отзыву другого или скрытого произведения дают 404. Результат сохраняется на
+    запросе и переиспользуется представлением, сериализаторами и
+    правами доступа.
+    """
+    parents = getattr(request, 'nested_parents', None)
+    if parents is not None:
+        return parents
+    if 'review_id' in kwargs:
+        review = get_object_or_404(
+            Review.objects.select_related('title'),
+            pk=kwargs['review_id'], title_id=kwargs['title_id'],
+            title__deleted_at__isnull=True)
+        parents = {'title': review.title, 'review': review}
+    elif 'title_id' in kwargs:
+        parents = {'title': get_object_or_404(Title, pk=kwargs['title_id'])}
+    else:
+        parents = {}
+    request.nested_parents = parents
+    return parents
+
+
+class NestedResourceMixin:
+
+    def get_parents(self):
+        return resolve_parents(self.request, self.kwargs)
+
+    def get_title(self):
+        return self.get_parents()['title']
+
+    def get_review(self):
+        return self.get_parents()['review']
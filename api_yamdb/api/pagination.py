@@ -0,0 +1,209 @@
+import base64
+import hashlib
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .versions import get_collection_version
+
+
+class CountedLimitOffsetPagination(LimitOffsetPagination):
+    """Limit/offset пагинация без COUNT(*) на каждый запрос.
+
+    Число записей берётся из счётчика, который поддерживает
+    представление (метод ``get_maintained_count``), иначе из кэша. Ключ
+    кэша включает SQL выборки и версию коллекции, если представление
+    её ведёт (``get_version_key``), поэтому после изменений счётчик
+    пересчитывается; без версии значение живёт ``count_cache_timeout``
+    секунд. Параметр ``count=exact`` всегда считает точно.
+    """
+
+    count_query_param = 'count'
+    count_cache_timeout = 60
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.view = view
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_count(self, queryset):
+        if self.request.query_params.get(self.count_query_param) == 'exact':
+            return super().get_count(queryset)
+        get_maintained_count = getattr(
+            self.view, 'get_maintained_count', None)
+        if get_maintained_count is not None:
+            count = get_maintained_count(queryset)
+            if count is not None:
+                return count
+        try:
+            sql, params = queryset.query.sql_with_params()
+        except EmptyResultSet:
+            return 0
+        key = self.get_count_cache_key(f'{sql}:{params}')
+        count = cache.get(key)
+        if count is None:
+            count = super().get_count(queryset)
+            cache.set(key, count, timeout=self.count_cache_timeout)
+        return count
+
+    def get_count_cache_key(self, query):
+        get_version_key = getattr(self.view, 'get_version_key', None)
+        if get_version_key is not None:
+            token, _ = get_collection_version(get_version_key())
+            query = f'{token}:{query}'
+        return 'count:' + hashlib.sha1(query.encode()).hexdigest()
+
+
+class KeysetPagination(CountedLimitOffsetPagination):
+    """Limit/offset пагинация с необязательным режимом курсора.
+
+    Если в запросе передан параметр ``cursor`` (для первой страницы -
+    пустой), выборка продолжается строго после последней записи
+    предыдущей страницы по полям ``ordering``. Все поля сортируются по
+    убыванию, последнее поле должно быть уникальным. Первое поле
+    ограничивается диапазоном, поэтому база начинает чтение индекса
+    сразу с нужной записи, и стоимость страницы не зависит от её
+    глубины. Записи с NULL в первом поле идут в конце и дочитываются
+    отдельным запросом.
+    """
+
+    cursor_query_param = 'cursor'
+    cursor_only = False
+    ordering = ('-id',)
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = (
+            self.cursor_only
+            or self.cursor_query_param in request.query_params
+        )
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.model = queryset.model
+        self.limit = self.get_limit(request) or self.default_limit
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(
+            request.query_params.get(self.cursor_query_param))
+        size = self.limit + 1
+        if position is None:
+            page = list(queryset[:size])
+        else:
+            page = list(
+                queryset.filter(self.get_seek_filter(position))[:size])
+            if len(page) < size and self.has_null_tail(position):
+                first = self.fields[0]
+                page += list(queryset.filter(
+                    **{f'{first}__isnull': True})[:size - len(page)])
+        self.has_next = len(page) > self.limit
+        page = page[:self.limit]
+        self.next_position = (
+            self.get_position(page[-1]) if self.has_next else None)
+        return page
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_cursor_link(),
+            'results': data,
+        })
+
+    @property
+    def fields(self):
+        return [field.lstrip('-') for field in self.ordering]
+
+    def get_position(self, instance):
+        return [getattr(instance, field) for field in self.fields]
+
+    def get_seek_filter(self, position):
+        first, value = self.fields[0], position[0]
+        if value is None:
+            bound = self.equal(first, value)
+            conditions = []
+        else:
+            bound = Q(**{f'{first}__lte': value})
+            conditions = [Q(**{f'{first}__lt': value})]
+        for index in range(1, len(self.fields)):
+            condition = self.after(self.fields[index], position[index])
+            for prev_field, prev_value in zip(self.fields[:index], position):
+                condition &= self.equal(prev_field, prev_value)
+            conditions.append(condition)
+        return bound & reduce(or_, conditions)
+
+    def has_null_tail(self, position):
+        # Диапазон по первому полю не включает NULL, идущие в конце.
+        return (
+            position[0] is not None
+            and self.model._meta.get_field(self.fields[0]).null
+        )
+
+    def after(self, field, value):
+        # При сортировке по убыванию NULL оказываются в конце выборки.
+        if value is None:
+            return Q(pk__in=[])
+        condition = Q(**{f'{field}__lt': value})
+        if self.model._meta.get_field(field).null:
+            condition |= Q(**{f'{field}__isnull': True})
+        return condition
+
+    @staticmethod
+    def equal(field, value):
+        if value is None:
+            return Q(**{f'{field}__isnull': True})
+        return Q(**{field: value})
+
+    def encode_cursor(self, position):
+        # Даты сохраняются с микросекундами, иначе сравнение на
+        # границе страницы пропустит или повторит записи.
+        payload = json.dumps(
+            [value.isoformat() if hasattr(value, 'isoformat') else value
+             for value in position])
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(
+                self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        # Курсор приходит от клиента: значения приводятся к типам полей,
+        # иначе подделанный курсор дойдёт до ORM и вызовет ошибку 500.
+        try:
+            return [
+                None if value is None
+                else self.model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.fields, position)
+            ]
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_cursor_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(
+            url, self.cursor_query_param,
+            self.encode_cursor(self.next_position))
+
+
+class TitlePagination(KeysetPagination):
+    ordering = ('-rating', '-id')
+
+
+class PubDatePagination(KeysetPagination):
+    cursor_only = True
+    ordering = ('-pub_date', '-id')
@@ -11,7 +11,7 @@ class IsAuthorAdminModeratorOrReadOnly(permissions.BasePermission):
             return request.user.is_authenticated
 
         return request.user.is_authenticated and (
-            request.user == obj.author
+            request.user.pk == obj.author_id
             or request.user.is_moderator
             or request.user.is_admin
         )
@@ -32,3 +32,11 @@ class IsAdmin(permissions.BasePermission):
         return (
             request.user.is_authenticated and request.user.is_admin
         )
+
+
+class IsModeratorOrAdmin(permissions.BasePermission):
+
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and (
+            request.user.is_moderator or request.user.is_admin
+        )
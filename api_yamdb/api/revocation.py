@@ -0,0 +1,161 @@
+import hashlib
+import math
+import threading
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from reviews.models import IssuedToken
+from .versions import bump_on_commit, get_collection_version, version_key
+
+REVOKED_TOKENS_VERSION_KEY = version_key('revoked_tokens')
+# Доля токенов, для которых фильтр ошибочно требует проверки в базе.
+FALSE_POSITIVE_RATE = 0.01
+# Запас при догрузке: транзакция могла отозвать токен до предыдущей
+# загрузки, а зафиксироваться после неё.
+LOAD_OVERLAP = timedelta(minutes=5)
+
+
+class BloomFilter:
+    """Компактное множество строк без ложноотрицательных ответов.
+
+    Размер рассчитывается на ``capacity`` элементов; после её превышения
+    доля ложноположительных ответов растёт, и фильтр стоит перестроить.
+    """
+
+    def __init__(self, items=(), capacity=None,
+                 error_rate=FALSE_POSITIVE_RATE):
+        items = list(items)
+        self.capacity = max(capacity or len(items), 1)
+        self.count = 0
+        self.size = max(64, math.ceil(
+            -self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        for item in items:
+            self.add(item)
+
+    def positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return (
+            (first + index * second) % self.size
+            for index in range(self.hashes)
+        )
+
+    @property
+    def full(self):
+        return self.count > self.capacity
+
+    def add(self, item):
+        if item in self:
+            return
+        self.count += 1
+        for position in self.positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self.positions(item)
+        )
+
+
+def revoked():
+    return IssuedToken.objects.filter(
+        revoked_at__isnull=False, expires_at__gt=timezone.now())
+
+
+class RevocationList:
+    """Отозванные токены: фильтр Блума в памяти процесса и таблица в базе.
+
+    Для большинства токенов фильтр отвечает отрицательно, и база не
+    нужна. Положительный ответ подтверждается точным запросом по jti.
+    Фильтр помечен версией из общего кэша: когда другой воркер отзывает
+    токены, в фильтр догружаются только отозванные после предыдущей
+    загрузки. Целиком фильтр перестраивается при смене эпохи базы и
+    при заполнении.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (эпоха, версия, с какого времени догружать, фильтр)
+        self._state = (None, None, None, BloomFilter())
+
+    def load(self):
+        version, _ = get_collection_version(REVOKED_TOKENS_VERSION_KEY)
+        state = self._state
+        if state[1] == version:
+            return state[3]
+        with self._lock:
+            state = self._state
+            if state[1] != version:
+                # Версия коллекции начинается с эпохи базы.
+                epoch = version.partition(':')[0]
+                started = timezone.now()
+                bloom = state[3]
+                if state[0] != epoch or bloom.full:
+                    jtis = list(revoked().values_list('jti', flat=True))
+                    bloom = BloomFilter(jtis, capacity=2 * len(jtis))
+                else:
+                    for jti in revoked().filter(
+                            revoked_at__gte=state[2]).values_list(
+                                'jti', flat=True):
+                        bloom.add(jti)
+                self._state = (
+                    epoch, version, started - LOAD_OVERLAP, bloom)
+            return self._state[3]
+
+    def __contains__(self, jti):
+        return jti in self.load() and revoked().filter(jti=jti).exists()
+
+
+revoked_tokens = RevocationList()
+
+
+def record_tokens(user, *tokens):
+    IssuedToken.objects.bulk_create(
+        IssuedToken(
+            jti=token[api_settings.JTI_CLAIM], user=user,
+            expires_at=datetime_from_epoch(token['exp']))
+        for token in tokens
+    )
+
+
+def consume_token(token):
+    """Погашает одноразовый токен обновления.
+
+    Строка удаляется условным запросом, поэтому из параллельных запросов
+    с одним токеном успешен только один. Возвращает False, если токен
+    уже использован, отозван или не выдавался.
+    """
+    deleted, _ = IssuedToken.objects.filter(
+        jti=token[api_settings.JTI_CLAIM], revoked_at__isnull=True,
+    ).delete()
+    return bool(deleted)
+
+
+def revoke_token(token):
+    """Отзывает токен, в том числе выданный без записи в таблицу."""
+    IssuedToken.objects.update_or_create(
+        jti=token[api_settings.JTI_CLAIM],
+        defaults={
+            'revoked_at': timezone.now(),
+            'expires_at': datetime_from_epoch(token['exp']),
+        },
+    )
+    bump_on_commit(REVOKED_TOKENS_VERSION_KEY)
+
+
+def revoke_user_tokens(user_id):
+    """Отзывает все действующие токены пользователя."""
+    now = timezone.now()
+    revoked_count = IssuedToken.objects.filter(
+        user_id=user_id, revoked_at__isnull=True, expires_at__gt=now,
+    ).update(revoked_at=now)
+    if revoked_count:
+        bump_on_commit(REVOKED_TOKENS_VERSION_KEY)
+    return revoked_count
@@ -2,11 +2,15 @@ import re
 
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
 
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import (SLUG_MAX_LENGTH, Category, Comment,
+                            DeletionJob, Genre, OutboxEvent, Review, Title)
 
 User = get_user_model()
 
+BULK_MODERATION_MAX_SIZE = 1000
+
 
 class UserCreationSerializer(serializers.Serializer):
     email = serializers.EmailField(
@@ -34,6 +38,10 @@ class ConfirmationCodeSerializer(serializers.Serializer):
     confirmation_code = serializers.CharField(required=True)
 
 
+class RefreshTokenSerializer(serializers.Serializer):
+    refresh = serializers.CharField(required=True)
+
+
 class MeSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -51,8 +59,11 @@ class UserSerializer(serializers.ModelSerializer):
 
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
-        exclude = ('id',)
+        exclude = ('id', 'deleted_at')
         model = Category
+        # Скрытая до удаления строка продолжает занимать slug.
+        extra_kwargs = {'slug': {'validators': [
+            UniqueValidator(queryset=Category.all_objects.all())]}}
 
     def validate_slug(self, value):
         if not re.match(r'^[-a-zA-Z0-9_]+$', value):
@@ -65,8 +76,11 @@ class CategorySerializer(serializers.ModelSerializer):
 
 class GenreSerializer(serializers.ModelSerializer):
     class Meta:
-        exclude = ('id',)
+        exclude = ('id', 'deleted_at')
         model = Genre
+        # Скрытая до удаления строка продолжает занимать slug.
+        extra_kwargs = {'slug': {'validators': [
+            UniqueValidator(queryset=Genre.all_objects.all())]}}
 
     def validate_slug(self, value):
         if not re.match(r'^[-a-zA-Z0-9_]+$', value):
@@ -78,13 +92,24 @@ class GenreSerializer(serializers.ModelSerializer):
 
 class TitleReadSerializer(serializers.ModelSerializer):
     rating = serializers.IntegerField(read_only=True, default=None)
+    review_count = serializers.IntegerField(source='score_count',
+                                            read_only=True)
     genre = GenreSerializer(many=True, read_only=True)
     category = CategorySerializer(read_only=True)
 
     class Meta:
-        fields = '__all__'
+        fields = ('id', 'name', 'year', 'rating', 'review_count',
+                  'description', 'genre', 'category')
         model = Title
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Ссылка на скрытую категорию обнуляется фоновым заданием позже,
+        # а в ответах категория пропадает сразу.
+        if instance.category is not None and instance.category.deleted_at:
+            data['category'] = None
+        return data
+
 
 class TitleWriteSerializer(serializers.ModelSerializer):
     genre = serializers.SlugRelatedField(slug_field='slug', many=True,
@@ -93,7 +118,23 @@ class TitleWriteSerializer(serializers.ModelSerializer):
                                             queryset=Category.objects.all())
 
     class Meta:
-        fields = '__all__'
+        fields = ('id', 'name', 'year', 'description', 'genre', 'category')
+        model = Title
+
+
+class TitleBulkItemSerializer(serializers.ModelSerializer):
+    """Проверяет одно произведение пакета без обращений к базе.
+
+    Слаги жанров и категории только проверяются на формат, их наличие
+    проверяет представление одним запросом на весь пакет.
+    """
+
+    genre = serializers.ListField(
+        child=serializers.CharField(max_length=SLUG_MAX_LENGTH))
+    category = serializers.CharField(max_length=SLUG_MAX_LENGTH)
+
+    class Meta:
+        fields = ('name', 'year', 'description', 'genre', 'category')
         model = Title
 
 
@@ -103,23 +144,42 @@ class ReviewSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = ('id', 'text', 'author', 'score', 'pub_date')
+        fields = ('id', 'text', 'author', 'score', 'pub_date',
+                  'comment_count')
         model = Review
 
     def validate(self, data):
         request = self.context.get('request')
 
         if request.method == 'POST':
-            title_id = self.context.get('view').kwargs.get('title_id')
+            title = self.context.get('view').get_title()
             user = request.user
 
-            if Review.objects.filter(title_id=title_id, author=user).exists():
+            if title.reviews.filter(author=user).exists():
                 raise serializers.ValidationError(
                     'Вы уже оставили отзыв на это произведение.'
                 )
         return data
 
 
+class ReviewTitleSerializer(serializers.ModelSerializer):
+    class Meta:
+        fields = ('id', 'name')
+        model = Title
+
+
+class LatestReviewSerializer(serializers.ModelSerializer):
+    author = serializers.SlugRelatedField(
+        read_only=True, slug_field='username'
+    )
+    title = ReviewTitleSerializer(read_only=True)
+
+    class Meta:
+        fields = ('id', 'title', 'text', 'author', 'score', 'pub_date',
+                  'comment_count')
+        model = Review
+
+
 class CommentSerializer(serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username'
@@ -128,3 +188,44 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         fields = ('id', 'text', 'author', 'pub_date')
         model = Comment
+
+
+class UserCommentSerializer(CommentSerializer):
+    review = serializers.PrimaryKeyRelatedField(read_only=True)
+    title = ReviewTitleSerializer(source='review.title', read_only=True)
+
+    class Meta(CommentSerializer.Meta):
+        fields = ('id', 'title', 'review', 'text', 'author', 'pub_date')
+
+
+class ModerationSerializer(serializers.Serializer):
+    """Выбор отзывов или комментариев для модерации набором."""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False, max_length=BULK_MODERATION_MAX_SIZE,
+        required=False)
+    author = serializers.SlugRelatedField(
+        slug_field='username', queryset=User.objects.all(), required=False)
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        if not data:
+            raise serializers.ValidationError(
+                'Укажите список ids или хотя бы один фильтр.')
+        return data
+
+
+class DeletionJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        fields = ('id', 'target', 'object_id', 'object_repr', 'status',
+                  'step', 'processed', 'created_at', 'finished_at')
+        model = DeletionJob
+
+
+class OutboxEventSerializer(serializers.ModelSerializer):
+    class Meta:
+        fields = ('id', 'event_type', 'payload', 'attempts', 'last_error',
+                  'failed', 'created_at', 'available_at')
+        model = OutboxEvent
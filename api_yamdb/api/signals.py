@@ -0,0 +1,109 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_migrate,
+                                      post_save)
+from django.dispatch import receiver
+
+from reviews.models import (Category, Comment, Genre, Review, Title, User,
+                            post_bulk_soft_delete, post_soft_delete)
+from reviews.signals import is_suspended
+from .revocation import revoke_user_tokens
+from .versions import EPOCH_VERSION_KEY, bump_on_commit, version_key
+
+TITLES_VERSION_KEY = version_key('titles')
+USERS_VERSION_KEY = version_key('users')
+
+
+def reviews_version_key(title_id):
+    return version_key('reviews', title_id)
+
+
+def comments_version_key(review_id):
+    return version_key('comments', review_id)
+
+
+def user_version_key(user_id):
+    return version_key('user', user_id)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(post_soft_delete, sender=Title)
+def title_changed(sender, instance, **kwargs):
+    bump_on_commit(TITLES_VERSION_KEY, reviews_version_key(instance.pk))
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_soft_delete, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_soft_delete, sender=Category)
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_relations_changed(sender, **kwargs):
+    bump_on_commit(TITLES_VERSION_KEY)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+@receiver(post_soft_delete, sender=Review)
+def review_changed(sender, instance, **kwargs):
+    if is_suspended():
+        return
+    bump_on_commit(
+        TITLES_VERSION_KEY,
+        reviews_version_key(instance.title_id),
+        comments_version_key(instance.pk),
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_soft_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    if is_suspended():
+        return
+    # Список отзывов отдаёт comment_count, поэтому его версия меняется
+    # вместе с комментариями.
+    if Comment.review.is_cached(instance):
+        title_id = instance.review.title_id
+    else:
+        title_id = Review.all_objects.filter(
+            pk=instance.review_id).values_list('title_id', flat=True).first()
+    keys = [comments_version_key(instance.review_id)]
+    if title_id is not None:
+        keys.append(reviews_version_key(title_id))
+    bump_on_commit(*keys)
+
+
+@receiver(post_bulk_soft_delete, sender=Review)
+def reviews_removed(sender, removed, **kwargs):
+    bump_on_commit(
+        TITLES_VERSION_KEY,
+        *{reviews_version_key(title_id) for title_id in removed.values()},
+        *(comments_version_key(review_id) for review_id in removed),
+    )
+
+
+@receiver(post_bulk_soft_delete, sender=Comment)
+def comments_removed(sender, removed, title_ids, **kwargs):
+    bump_on_commit(
+        *{comments_version_key(review_id) for review_id in removed.values()},
+        *(reviews_version_key(title_id) for title_id in title_ids),
+    )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_soft_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    bump_on_commit(USERS_VERSION_KEY, user_version_key(instance.pk))
+
+
+@receiver(post_soft_delete, sender=User)
+def user_removed(sender, instance, **kwargs):
+    revoke_user_tokens(instance.pk)
+
+
+@receiver(post_migrate)
+def database_reset(sender, **kwargs):
+    # migrate и flush меняют данные в обход сигналов моделей.
+    bump_on_commit(EPOCH_VERSION_KEY)
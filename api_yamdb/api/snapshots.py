@@ -0,0 +1,60 @@
+import threading
+
+from reviews.models import Category, Genre
+from .serializers import CategorySerializer, GenreSerializer
+from .versions import bump_on_commit, get_collection_version, version_key
+
+
+class CatalogueSnapshot:
+    """Сериализованный снимок небольшого справочника в памяти процесса.
+
+    Снимок помечен версией из общего кэша. Любое изменение справочника
+    записывает в кэш новую случайную версию, поэтому каждый воркер при
+    следующем запросе замечает расхождение и перечитывает таблицу.
+    Версия читается до запроса к базе, так что снимок, собранный
+    одновременно с изменением, будет отброшен.
+    """
+
+    def __init__(self, model, serializer_class):
+        self.model = model
+        self.serializer_class = serializer_class
+        self.version_key = version_key(
+            'snapshot', model._meta.label_lower)
+        self._lock = threading.Lock()
+        # Версия, элементы и индекс по имени заменяются одним присваиванием,
+        # чтобы параллельные запросы не видели их вперемешку.
+        self._snapshot = (None, (), {})
+
+    def bump_on_commit(self, **kwargs):
+        bump_on_commit(self.version_key)
+
+    def load(self):
+        version, _ = get_collection_version(self.version_key)
+        snapshot = self._snapshot
+        if snapshot[0] == version:
+            return snapshot
+        with self._lock:
+            if self._snapshot[0] != version:
+                items = tuple(self.serializer_class(
+                    self.model.objects.all(), many=True).data)
+                by_name = {}
+                for item in items:
+                    by_name.setdefault(item['name'].casefold(), []).append(
+                        item)
+                self._snapshot = (version, items, {
+                    name: tuple(group) for name, group in by_name.items()})
+            return self._snapshot
+
+    def search(self, terms=()):
+        """Возвращает элементы, имя которых совпадает со всеми терминами."""
+        _, items, by_name = self.load()
+        names = {term.casefold() for term in terms}
+        if not names:
+            return items
+        if len(names) > 1:
+            return ()
+        return by_name.get(names.pop(), ())
+
+
+category_snapshot = CatalogueSnapshot(Category, CategorySerializer)
+genre_snapshot = CatalogueSnapshot(Genre, GenreSerializer)
@@ -0,0 +1,114 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Least
+from django.db.models.lookups import GreaterThanOrEqual
+from rest_framework.throttling import SimpleRateThrottle
+
+from reviews.models import RateLimitBucket
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """Ограничение частоты запросов корзиной токенов в общей таблице.
+
+    Частота ``N/период`` из ``DEFAULT_THROTTLE_RATES`` задаёт ёмкость
+    корзины ``N`` и пополнение ``N`` запросов за период. Запрос списывает
+    токен одним условным UPDATE, поэтому параллельные воркеры не могут
+    потратить один токен дважды.
+    """
+
+    # Методы, на которые распространяется ограничение; None - все.
+    methods = None
+
+    def get_bucket_key(self, request, view):
+        # По умолчанию корзина на IP-адрес клиента; X-Forwarded-For
+        # учитывается только с настройкой NUM_PROXIES.
+        return self.get_ident(request)
+
+    def get_cache_key(self, request, view):
+        if self.methods is not None and request.method not in self.methods:
+            return None
+        ident = self.get_bucket_key(request, view)
+        if not ident:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        now = self.timer()
+        refill_rate = self.num_requests / self.duration
+        available = Least(
+            Value(float(self.num_requests)),
+            F('tokens') + (Value(now) - F('updated_at')) * Value(refill_rate),
+        )
+        buckets = RateLimitBucket.objects.filter(key=key)
+        spend = buckets.filter(GreaterThanOrEqual(available, 1))
+        if spend.update(tokens=available - 1, updated_at=now):
+            return True
+        # Отказ не должен брать блокировку записи: корзина создаётся,
+        # только если её ещё нет.
+        bucket = buckets.values('tokens', 'updated_at').first()
+        if bucket is None:
+            try:
+                with transaction.atomic():
+                    RateLimitBucket.objects.create(
+                        key=key, tokens=self.num_requests - 1,
+                        updated_at=now)
+                return True
+            except IntegrityError:
+                # Корзину одновременно создал другой запрос.
+                if spend.update(tokens=available - 1, updated_at=now):
+                    return True
+                bucket = buckets.values('tokens', 'updated_at').first()
+                if bucket is None:
+                    return True
+        tokens = min(self.num_requests, bucket['tokens'] + (
+            now - bucket['updated_at']) * refill_rate)
+        self.wait_time = max(1 - tokens, 0) / refill_rate
+        return False
+
+    def wait(self):
+        return self.wait_time
+
+
+class UsernameThrottle(TokenBucketThrottle):
+    """Корзина на имя пользователя: из токена или из тела запроса."""
+
+    def get_bucket_key(self, request, view):
+        if request.user.is_authenticated:
+            return request.user.username
+        data = request.data
+        username = data.get('username') if hasattr(data, 'get') else None
+        return username if isinstance(username, str) else None
+
+
+class AuthIPThrottle(TokenBucketThrottle):
+    scope = 'auth_ip'
+
+
+class AuthUsernameThrottle(UsernameThrottle):
+    scope = 'auth_username'
+
+
+class ReviewIPThrottle(TokenBucketThrottle):
+    scope = 'reviews_ip'
+    methods = ('POST',)
+
+
+class ReviewUsernameThrottle(UsernameThrottle):
+    scope = 'reviews_username'
+    methods = ('POST',)
+
+
+class CommentIPThrottle(TokenBucketThrottle):
+    scope = 'comments_ip'
+    methods = ('POST',)
+
+
+class CommentUsernameThrottle(UsernameThrottle):
+    scope = 'comments_username'
+    methods = ('POST',)
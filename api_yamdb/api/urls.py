@@ -4,18 +4,36 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     CategoryViewSet,
     CommentViewSet,
+    DeadLetterViewSet,
+    DeletionJobViewSet,
     GenreViewSet,
+    LatestReviewViewSet,
+    ModerationViewSet,
     ReviewViewSet,
     TitleViewSet,
+    UserCommentViewSet,
+    UserReviewViewSet,
     UserViewSet,
     get_jwt_token,
+    logout,
+    refresh_jwt_token,
     send_confirmation_code)
 
 v1_router = DefaultRouter()
 v1_router.register('users', UserViewSet)
+v1_router.register(r'users/(?P<username>[^/.]+)/reviews',
+                   UserReviewViewSet, basename='user-reviews')
+v1_router.register(r'users/(?P<username>[^/.]+)/comments',
+                   UserCommentViewSet, basename='user-comments')
 v1_router.register('genres', GenreViewSet, basename='genres')
 v1_router.register('categories', CategoryViewSet, basename='categories')
 v1_router.register('titles', TitleViewSet, basename='titles')
+v1_router.register('reviews/latest', LatestReviewViewSet,
+                   basename='latest-reviews')
+v1_router.register('moderation', ModerationViewSet, basename='moderation')
+v1_router.register('deletions', DeletionJobViewSet, basename='deletions')
+v1_router.register('outbox/dead-letters', DeadLetterViewSet,
+                   basename='dead-letters')
 v1_router.register(r'titles/(?P<title_id>\d+)/reviews',
                    ReviewViewSet, basename='reviews')
 v1_router.register(
@@ -28,6 +46,8 @@ v1_router.register(
 v1_auth_patterns = [
     path('signup/', send_confirmation_code, name='send_confirmation_code'),
     path('token/', get_jwt_token, name='get_token'),
+    path('token/refresh/', refresh_jwt_token, name='refresh_token'),
+    path('logout/', logout, name='logout'),
 ]
 
 urlpatterns = [
@@ -0,0 +1,116 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+
+from reviews.sqlite import pragma_statements
+
+VERSION_KEY_PREFIX = 'version'
+
+SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS version (
+        key TEXT PRIMARY KEY,
+        token TEXT NOT NULL,
+        modified REAL NOT NULL
+    ) WITHOUT ROWID
+"""
+
+
+class VersionStore:
+    """Версии коллекций в отдельном файле SQLite.
+
+    Запись - один UPSERT по первичному ключу, её стоимость не растёт с
+    числом ключей, и ничего не вытесняется. Файл не относится к основной
+    базе, поэтому чтение версий не добавляет запросов к ней. У каждого
+    потока и процесса своё соединение.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @property
+    def connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            path = settings.VERSIONS_DATABASE
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            connection = sqlite3.connect(path, isolation_level=None)
+            for statement in pragma_statements(settings.SQLITE_PRAGMAS):
+                connection.execute(statement)
+            connection.execute(SCHEMA_SQL)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get_many(self, keys):
+        placeholders = ', '.join('?' * len(keys))
+        return {
+            key: (token, modified)
+            for key, token, modified in self.connection.execute(
+                'SELECT key, token, modified FROM version '
+                f'WHERE key IN ({placeholders})', keys)
+        }
+
+    def add(self, key, version):
+        self.connection.execute(
+            'INSERT OR IGNORE INTO version (key, token, modified) '
+            'VALUES (?, ?, ?)', (key, *version))
+
+    def set_many(self, versions):
+        self.connection.executemany(
+            'INSERT INTO version (key, token, modified) VALUES (?, ?, ?) '
+            'ON CONFLICT (key) DO UPDATE SET token = excluded.token, '
+            'modified = excluded.modified',
+            [(key, *version) for key, version in versions.items()])
+
+
+store = VersionStore()
+
+
+def version_key(*parts):
+    return ':'.join((VERSION_KEY_PREFIX, *map(str, parts)))
+
+
+# Меняется после migrate и flush, которые обходят сигналы моделей.
+EPOCH_VERSION_KEY = version_key('epoch')
+
+
+def new_version():
+    return uuid.uuid4().hex, time.time()
+
+
+def get_versions(*keys):
+    """Возвращает пары (токен, время изменения) для ключей из хранилища.
+
+    Отсутствующий ключ создаётся; если его одновременно создал другой
+    процесс, берётся записанное им значение.
+    """
+    versions = store.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    for key in missing:
+        store.add(key, new_version())
+    if missing:
+        versions.update(store.get_many(missing))
+    return [versions[key] for key in keys]
+
+
+def get_version(key):
+    return get_versions(key)[0]
+
+
+def get_collection_version(key):
+    """Версия коллекции с учётом эпохи базы: (токен, время изменения)."""
+    (epoch, reset), (token, modified) = get_versions(EPOCH_VERSION_KEY, key)
+    return f'{epoch}:{token}', max(reset, modified)
+
+
+def bump_version(*keys):
+    store.set_many({key: new_version() for key in keys})
+
+
+def bump_on_commit(*keys):
+    transaction.on_commit(lambda: bump_version(*keys))
@@ -1,109 +1,304 @@
-from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db import IntegrityError
-from django.db.models import Avg, Q
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, status
-from rest_framework.decorators import action, api_view, permission_classes
-from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.decorators import (action, api_view, permission_classes,
+                                       throttle_classes)
 from rest_framework.permissions import (
     AllowAny, IsAuthenticated, IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 from rest_framework.viewsets import GenericViewSet, ModelViewSet
-from rest_framework_simplejwt.tokens import AccessToken
-
-from reviews.models import Category, Genre, Review, Title
+from rest_framework_simplejwt.settings import api_settings
+
+from reviews.models import (Category, Comment, DeletionJob, Genre,
+                            GenreTitle, OutboxEvent, Review, ScoreCount,
+                            Title)
+from reviews.deletion import schedule_deletion
+from reviews.handlers import CONFIRMATION_REQUESTED
+from reviews.moderation import remove_comments, remove_reviews
+from reviews.outbox import enqueue, requeue
+from .authentication import (get_refresh_token, rotate_refresh_token,
+                             tokens_for)
+from .conditional import ConditionalGetMixin
 from .filters import TitleFilter
+from .nested import NestedResourceMixin
+from .pagination import (CountedLimitOffsetPagination,
+                         PubDatePagination, TitlePagination)
 from .permissions import (IsAdmin, IsAdminOrReadOnly,
-                          IsAuthorAdminModeratorOrReadOnly)
+                          IsAuthorAdminModeratorOrReadOnly,
+                          IsModeratorOrAdmin)
+from .revocation import revoke_token, revoke_user_tokens
 from .serializers import (CategorySerializer, CommentSerializer,
-                          ConfirmationCodeSerializer,
-                          GenreSerializer, MeSerializer,
-                          ReviewSerializer, TitleReadSerializer,
-                          TitleWriteSerializer, UserCreationSerializer,
-                          UserSerializer)
+                          ConfirmationCodeSerializer, DeletionJobSerializer,
+                          GenreSerializer, LatestReviewSerializer,
+                          MeSerializer, ModerationSerializer,
+                          OutboxEventSerializer, RefreshTokenSerializer,
+                          ReviewSerializer, TitleBulkItemSerializer,
+                          TitleReadSerializer,
+                          TitleWriteSerializer, UserCommentSerializer,
+                          UserCreationSerializer, UserSerializer)
+from .signals import (TITLES_VERSION_KEY, USERS_VERSION_KEY,
+                      comments_version_key, reviews_version_key)
+from .snapshots import category_snapshot, genre_snapshot
+from .throttling import (AuthIPThrottle, AuthUsernameThrottle,
+                         CommentIPThrottle, CommentUsernameThrottle,
+                         ReviewIPThrottle, ReviewUsernameThrottle)
+from .versions import bump_on_commit
 
 User = get_user_model()
 
+BULK_CREATE_MAX_SIZE = 10000
+BULK_BATCH_SIZE = 500
+# Понижение роли отзывает выданные пользователю токены.
+ROLE_RANKS = {User.USER: 0, User.MODERATOR: 1, User.ADMIN: 2}
+
+
+class DeferredDestroyMixin:
+    """DELETE скрывает объект и ставит удаление в очередь, ответ - 202.
+
+    Зависимые строки удаляются порциями фоновым обработчиком, ход
+    удаления доступен по адресу из заголовка ``Location``.
+    """
+
+    def destroy(self, request, *args, **kwargs):
+        job = schedule_deletion(self.get_object())
+        return Response(
+            DeletionJobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={'Location': reverse(
+                'deletions-detail', args=(job.pk,), request=request)},
+        )
+
 
-class CDLViewSet(mixins.CreateModelMixin, mixins.DestroyModelMixin,
-                 mixins.ListModelMixin, GenericViewSet):
+class CDLViewSet(DeferredDestroyMixin, mixins.CreateModelMixin,
+                 mixins.DestroyModelMixin, mixins.ListModelMixin,
+                 GenericViewSet):
     pass
 
 
-class CategoryViewSet(CDLViewSet):
+class SnapshotListMixin:
+    """Отдаёт список из снимка справочника в памяти, не обращаясь к БД."""
+
+    snapshot = None
+
+    def list(self, request, *args, **kwargs):
+        terms = filters.SearchFilter().get_search_terms(request)
+        page = self.paginate_queryset(list(self.snapshot.search(terms)))
+        return self.get_paginated_response(page)
+
+
+class CategoryViewSet(SnapshotListMixin, CDLViewSet):
     permission_classes = (IsAdminOrReadOnly,)
     lookup_field = 'slug'
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     filter_backends = (filters.SearchFilter,)
     search_fields = ('=name',)
+    snapshot = category_snapshot
 
 
-class TitleViewSet(ModelViewSet):
+class TitleViewSet(ConditionalGetMixin, DeferredDestroyMixin, ModelViewSet):
     permission_classes = (IsAdminOrReadOnly,)
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')).order_by('-rating')
+    queryset = Title.objects.select_related('category').prefetch_related(
+        'genre').order_by('-rating', '-id')
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
     http_method_names = ('get', 'post', 'patch', 'delete')
-    pagination_class = LimitOffsetPagination
+    pagination_class = TitlePagination
+
+    def get_version_key(self):
+        return TITLES_VERSION_KEY
 
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return TitleReadSerializer
         return TitleWriteSerializer
 
+    @action(detail=False, methods=('post',), permission_classes=(IsAdmin,))
+    def bulk(self, request):
+        if not isinstance(request.data, list):
+            return Response(
+                {'error': 'Ожидается список произведений'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(request.data) > BULK_CREATE_MAX_SIZE:
+            return Response(
+                {'error': 'В одном запросе можно передать не более '
+                          f'{BULK_CREATE_MAX_SIZE} произведений'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        items, errors = {}, []
+        for index, item in enumerate(request.data):
+            serializer = TitleBulkItemSerializer(data=item)
+            if serializer.is_valid():
+                items[index] = serializer.validated_data
+            else:
+                errors.append({'index': index, 'errors': serializer.errors})
+
+        genres = Genre.objects.in_bulk(
+            {slug for item in items.values() for slug in item['genre']},
+            field_name='slug')
+        categories = Category.objects.in_bulk(
+            {item['category'] for item in items.values()},
+            field_name='slug')
+        titles, indexes, genre_slugs = [], [], []
+        for index, item in items.items():
+            item_errors = {}
+            missing = [slug for slug in item['genre'] if slug not in genres]
+            if missing:
+                item_errors['genre'] = [
+                    f'Жанр со slug={slug} не существует.' for slug in missing]
+            if item['category'] not in categories:
+                item_errors['category'] = [
+                    f'Категория со slug={item["category"]} не существует.']
+            if item_errors:
+                errors.append({'index': index, 'errors': item_errors})
+                continue
+            titles.append(Title(
+                name=item['name'],
+                year=item['year'],
+                description=item.get('description'),
+                category=categories[item['category']],
+            ))
+            indexes.append(index)
+            genre_slugs.append(dict.fromkeys(item['genre']))
+
+        with transaction.atomic():
+            Title.objects.bulk_create(titles, batch_size=BULK_BATCH_SIZE)
+            GenreTitle.objects.bulk_create(
+                (GenreTitle(title=title, genre=genres[slug])
+                 for title, slugs in zip(titles, genre_slugs)
+                 for slug in slugs),
+                batch_size=BULK_BATCH_SIZE
+            )
+            bump_on_commit(TITLES_VERSION_KEY)
+
+        return Response(
+            {
+                'created': [
+                    {'index': index, 'id': title.id}
+                    for index, title in zip(indexes, titles)
+                ],
+                'errors': sorted(errors, key=lambda error: error['index']),
+            },
+            status=(status.HTTP_201_CREATED if titles
+                    else status.HTTP_400_BAD_REQUEST)
+        )
 
-class GenreViewSet(CDLViewSet):
+    @action(detail=True, methods=('get',))
+    def scores(self, request, pk=None):
+        title = get_object_or_404(Title.objects.only('id'), pk=pk)
+        histogram = ScoreCount.objects.histogram(title.id)
+        return Response(
+            [{'score': score, 'count': count}
+             for score, count in histogram.items()],
+            status=status.HTTP_200_OK
+        )
+
+
+class GenreViewSet(SnapshotListMixin, CDLViewSet):
     permission_classes = (IsAdminOrReadOnly,)
     lookup_field = 'slug'
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     filter_backends = (filters.SearchFilter,)
     search_fields = ('=name',)
+    snapshot = genre_snapshot
 
 
-class ReviewViewSet(ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, NestedResourceMixin, ModelViewSet):
     permission_classes = [
         IsAuthenticatedOrReadOnly, IsAuthorAdminModeratorOrReadOnly]
     serializer_class = ReviewSerializer
-    pagination_class = LimitOffsetPagination
+    pagination_class = CountedLimitOffsetPagination
+    throttle_classes = (ReviewIPThrottle, ReviewUsernameThrottle)
     filter_backends = (filters.OrderingFilter,)
     ordering_fields = ('-pub_date',)
     http_method_names = ('get', 'post', 'patch', 'delete')
 
-    def get_title(self):
-        title_id = self.kwargs.get('title_id')
-        return get_object_or_404(Title, id=title_id)
+    # Связанный менеджер произведения читает внешний ключ каждого отзыва.
+    conditional_object_fields = ('pk', 'title')
+
+    def get_version_key(self):
+        return reviews_version_key(self.kwargs.get('title_id'))
 
     def get_queryset(self):
-        title = self.get_title()
-        return title.reviews.all()
+        return self.get_title().reviews.select_related('author').only(
+            'id', 'title', 'text', 'score', 'pub_date', 'comment_count',
+            'author__username')
+
+    def get_maintained_count(self, queryset):
+        return self.get_title().score_count
 
     def perform_create(self, serializer):
-        title = self.get_title()
-        serializer.save(title=title, author=self.request.user)
+        serializer.save(title=self.get_title(), author=self.request.user)
+
+
+class LatestReviewViewSet(mixins.ListModelMixin, GenericViewSet):
+    permission_classes = (IsAuthenticatedOrReadOnly,)
+    serializer_class = LatestReviewSerializer
+    pagination_class = PubDatePagination
+    queryset = Review.objects.filter(
+        title__deleted_at__isnull=True).select_related(
+            'author', 'title').only(
+                'id', 'text', 'score', 'pub_date', 'comment_count',
+                'author__username', 'title__name')
+
+
+class UserFeedViewSet(mixins.ListModelMixin, GenericViewSet):
+    """Отзывы или комментарии пользователя от новых к старым."""
+
+    permission_classes = (IsAuthorAdminModeratorOrReadOnly,)
+    pagination_class = PubDatePagination
+
+    def get_queryset(self):
+        author = get_object_or_404(
+            User.objects.only('id'), username=self.kwargs['username'],
+            is_active=True)
+        return super().get_queryset().filter(author=author)
+
+
+class UserReviewViewSet(UserFeedViewSet):
+    serializer_class = LatestReviewSerializer
+    queryset = LatestReviewViewSet.queryset
 
 
-class CommentViewSet(ModelViewSet):
+class UserCommentViewSet(UserFeedViewSet):
+    serializer_class = UserCommentSerializer
+    queryset = Comment.objects.filter(
+        review__title__deleted_at__isnull=True).select_related(
+            'author', 'review__title').only(
+            'id', 'text', 'pub_date', 'author__username', 'review__id',
+            'review__title__name')
+
+
+class CommentViewSet(ConditionalGetMixin, NestedResourceMixin,
+                     ModelViewSet):
     permission_classes = [
         IsAuthenticatedOrReadOnly, IsAuthorAdminModeratorOrReadOnly]
     serializer_class = CommentSerializer
-    pagination_class = LimitOffsetPagination
+    pagination_class = CountedLimitOffsetPagination
+    throttle_classes = (CommentIPThrottle, CommentUsernameThrottle)
     filter_backends = (filters.OrderingFilter,)
     ordering_fields = ('-pub_date')
     http_method_names = ('get', 'post', 'patch', 'delete')
 
-    def get_review(self):
-        review_id = self.kwargs.get('review_id')
-        return get_object_or_404(Review, id=review_id)
+    conditional_object_fields = ('pk', 'review')
+
+    def get_version_key(self):
+        return comments_version_key(self.kwargs.get('review_id'))
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return self.get_review().comments.select_related('author').only(
+            'id', 'review', 'text', 'pub_date', 'author__username')
+
+    def get_maintained_count(self, queryset):
+        return self.get_review().comment_count
 
     def perform_create(self, serializer):
         serializer.save(
@@ -112,8 +307,73 @@ class CommentViewSet(ModelViewSet):
         )
 
 
+class ModerationViewSet(GenericViewSet):
+    """Удаление отзывов и комментариев набором в одной транзакции."""
+
+    permission_classes = (IsModeratorOrAdmin,)
+    serializer_class = ModerationSerializer
+    filter_fields = {
+        'ids': 'pk__in',
+        'author': 'author',
+        'since': 'pub_date__gte',
+        'until': 'pub_date__lt',
+    }
+
+    def get_selection(self, queryset):
+        serializer = self.get_serializer(data=self.request.data)
+        serializer.is_valid(raise_exception=True)
+        return queryset.filter(**{
+            self.filter_fields[name]: value
+            for name, value in serializer.validated_data.items()
+        })
+
+    @action(detail=False, methods=['post'])
+    def reviews(self, request):
+        removed, comment_ids = remove_reviews(
+            self.get_selection(Review.objects.all()))
+        return Response({
+            'reviews': sorted(removed), 'comments': sorted(comment_ids)})
+
+    @action(detail=False, methods=['post'])
+    def comments(self, request):
+        removed = remove_comments(self.get_selection(Comment.objects.all()))
+        return Response({'comments': sorted(removed)})
+
+
+class DeletionJobViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin,
+                         GenericViewSet):
+    permission_classes = (IsAdmin,)
+    queryset = DeletionJob.objects.all()
+    serializer_class = DeletionJobSerializer
+    pagination_class = CountedLimitOffsetPagination
+
+
+class DeadLetterViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin,
+                        GenericViewSet):
+    """События очереди, не доставленные после всех попыток."""
+
+    permission_classes = (IsAdmin,)
+    serializer_class = OutboxEventSerializer
+    pagination_class = CountedLimitOffsetPagination
+
+    def get_queryset(self):
+        queryset = OutboxEvent.objects.filter(failed=True)
+        event_type = self.request.query_params.get('event_type')
+        if event_type:
+            queryset = queryset.filter(event_type=event_type)
+        return queryset
+
+    @action(detail=True, methods=['post'])
+    def retry(self, request, pk=None):
+        event = self.get_object()
+        requeue(OutboxEvent.objects.filter(pk=event.pk))
+        event.refresh_from_db()
+        return Response(self.get_serializer(event).data)
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthIPThrottle, AuthUsernameThrottle])
 def send_confirmation_code(request):
     serializer = UserCreationSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
@@ -152,21 +412,15 @@ def send_confirmation_code(request):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    confirmation_code = default_token_generator.make_token(user)
-
-    send_mail(
-        'Код подтверждения',
-        f'Ваш код подтверждения: {confirmation_code}',
-        settings.DEFAULT_FROM_EMAIL,
-        [email],
-        fail_silently=False
-    )
+    # Письмо с кодом отправляет фоновый обработчик очереди событий.
+    enqueue(CONFIRMATION_REQUESTED, user_id=user.pk)
 
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthIPThrottle, AuthUsernameThrottle])
 def get_jwt_token(request):
     serializer = ConfirmationCodeSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
@@ -177,24 +431,65 @@ def get_jwt_token(request):
     user = get_object_or_404(User, username=username)
 
     if default_token_generator.check_token(user, confirmation_code):
-        token = AccessToken.for_user(user)
+        access, refresh = tokens_for(user)
         return Response(
-            {'token': str(token)}, status=status.HTTP_200_OK
+            {'token': str(access), 'refresh': str(refresh)},
+            status=status.HTTP_200_OK
         )
 
     return Response({'confirmation_code': 'Неверный код подтверждения'},
                     status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserViewSet(ModelViewSet):
-    queryset = User.objects.all()
+@api_view(['POST'])
+@permission_classes([AllowAny])
+@throttle_classes([AuthIPThrottle, AuthUsernameThrottle])
+def refresh_jwt_token(request):
+    serializer = RefreshTokenSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    access, refresh = rotate_refresh_token(
+        serializer.validated_data['refresh'])
+    return Response(
+        {'token': str(access), 'refresh': str(refresh)},
+        status=status.HTTP_200_OK
+    )
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def logout(request):
+    # Тело проверяется до отзыва: при ошибке токен доступа остаётся
+    # действительным, и запрос можно повторить.
+    refresh = None
+    if 'refresh' in request.data:
+        serializer = RefreshTokenSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        refresh = get_refresh_token(serializer.validated_data['refresh'])
+    revoke_token(request.auth)
+    if (refresh is not None
+            and refresh[api_settings.USER_ID_CLAIM] == request.user.pk):
+        revoke_token(refresh)
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UserViewSet(DeferredDestroyMixin, ModelViewSet):
+    queryset = User.objects.filter(is_active=True)
     serializer_class = UserSerializer
     permission_classes = (IsAdmin,)
     lookup_field = 'username'
     http_method_names = ('get', 'post', 'patch', 'delete')
     filter_backends = (filters.SearchFilter,)
     search_fields = ('=username',)
-    pagination_class = LimitOffsetPagination
+    pagination_class = CountedLimitOffsetPagination
+
+    def get_version_key(self):
+        return USERS_VERSION_KEY
+
+    def perform_update(self, serializer):
+        role = serializer.instance.role
+        user = serializer.save()
+        if ROLE_RANKS[user.role] < ROLE_RANKS[role]:
+            revoke_user_tokens(user.pk)
 
     @action(
         detail=False,
@@ -202,7 +497,8 @@ class UserViewSet(ModelViewSet):
         permission_classes=(IsAuthenticated,)
     )
     def me(self, request):
-        user = request.user
+        # В request.user загружены только поля для проверки прав.
+        user = get_object_or_404(self.get_queryset(), pk=request.user.pk)
         if request.method == 'GET':
             serializer = self.get_serializer(user)
             return Response(serializer.data, status=status.HTTP_200_OK)
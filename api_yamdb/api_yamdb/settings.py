@@ -67,9 +67,54 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Соединение переиспользуется запросами воркера, а не открывается
+        # заново на каждый запрос.
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Транзакция сразу берёт блокировку записи и ждёт её
+            # busy_timeout, а не падает с "database is locked" при попытке
+            # повысить блокировку чтения до записи.
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 5,
+        },
     }
 }
 
+# Профиль SQLite, применяемый к каждому новому соединению
+# (reviews/sqlite.py). Пустой словарь оставляет настройки по умолчанию.
+SQLITE_PRAGMAS = {
+    # Читатели не блокируют писателя и наоборот.
+    'journal_mode': 'wal',
+    # В режиме WAL сохраняет целостность, fsync только при checkpoint.
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    # Отрицательное значение - размер кэша страниц в КиБ (64 МиБ).
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'memory',
+}
+
+
+# Cache shared by all worker processes on the host
+
+CACHES = {
+    # Счётчики пагинации: по записи на запрос списка и версию коллекции.
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 20000,
+        },
+    },
+}
+
+# Версии коллекций (api/versions.py): по ключу на произведение, отзыв и
+# пользователя. Вытеснение версии вернуло бы 304 на устаревшие данные,
+# а запись в файловый кэш просматривает весь каталог, поэтому версии
+# хранятся в отдельной таблице SQLite.
+VERSIONS_DATABASE = os.path.join(BASE_DIR, 'cache', 'versions.sqlite3')
+
 
 # Password validation
 
@@ -115,17 +160,31 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 100
+    'PAGE_SIZE': 100,
+    # Приложение принимает запросы напрямую: X-Forwarded-For не учитывается
+    # при определении IP-адреса, иначе его можно подделать. За обратным
+    # прокси значение равно числу прокси.
+    'NUM_PROXIES': 0,
+    # Ёмкость корзины и её пополнение за период, см. api/throttling.py.
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': '30/min',
+        'auth_username': '10/min',
+        'reviews_ip': '120/min',
+        'reviews_username': '30/min',
+        'comments_ip': '240/min',
+        'comments_username': '60/min',
+    },
 }
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
+    'REFRESH_TOKEN_LIFETIME': timedelta(days=30),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
@@ -1,6 +1,24 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
+
+
+def restore_title_search(sender, using, **kwargs):
+    from .search import FTS_TABLE, install_title_search
+
+    connection = connections[using]
+    if FTS_TABLE in connection.introspection.table_names():
+        install_title_search(connection)
 
 
 class ReviewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reviews'
+
+    def ready(self):
+        from . import deletion, signals  # noqa: F401
+        from .sqlite import apply_sqlite_pragmas
+
+        post_migrate.connect(restore_title_search, sender=self)
+        connection_created.connect(apply_sqlite_pragmas)
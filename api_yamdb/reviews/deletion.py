@@ -0,0 +1,156 @@
+from functools import partial
+
+from django.apps import apps
+from django.db import transaction
+from django.utils import timezone
+
+from api.signals import TITLES_VERSION_KEY
+from api.versions import bump_on_commit
+from .models import (NAME_MAX_LENGTH, Category, Comment, DeletionJob, Genre,
+                     GenreTitle, Review, ScoreCount, Title, User,
+                     post_soft_delete)
+from .moderation import remove_comments, remove_reviews
+from .outbox import enqueue, handler
+from .signals import signals_suspended
+
+BATCH_SIZE = 500
+DELETION_REQUESTED = 'deletion.requested'
+
+
+def delete_batch(queryset, batch_size):
+    """Окончательно удаляет порцию строк выборки и возвращает их число.
+
+    Счётчики удаляемых строк либо уже скорректированы, либо принадлежат
+    удаляемому объекту, поэтому сигналы не обрабатываются.
+    """
+    ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+    if ids:
+        with signals_suspended():
+            queryset.model._base_manager.filter(pk__in=ids).delete()
+    return len(ids)
+
+
+def remove_batch(queryset, remove, batch_size):
+    """Помечает порцию строк удалёнными с поправкой счётчиков."""
+    ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+    if ids:
+        remove(queryset.model.objects.filter(pk__in=ids))
+    return len(ids)
+
+
+def clear_batch(queryset, field, batch_size):
+    """Обнуляет ссылку на удаляемый объект у порции строк."""
+    ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+    if not ids:
+        return 0
+    queryset.model._base_manager.filter(pk__in=ids).update(**{field: None})
+    # update() не отправляет сигналов, а закэшированные списки
+    # произведений должны перестать ссылаться на удаляемую категорию.
+    bump_on_commit(TITLES_VERSION_KEY)
+    return len(ids)
+
+
+def title_steps(pk):
+    return (
+        partial(delete_batch, Comment.all_objects.filter(
+            review__title_id=pk)),
+        partial(delete_batch, Review.all_objects.filter(title_id=pk)),
+        partial(delete_batch, GenreTitle.objects.filter(title_id=pk)),
+        partial(delete_batch, ScoreCount.objects.filter(title_id=pk)),
+    )
+
+
+def genre_steps(pk):
+    return (
+        partial(delete_batch, GenreTitle.objects.filter(genre_id=pk)),
+    )
+
+
+def category_steps(pk):
+    return (
+        partial(clear_batch, Title.all_objects.filter(category_id=pk),
+                'category'),
+    )
+
+
+def user_steps(pk):
+    # Отзывы и комментарии скрываются с поправкой рейтингов и счётчиков
+    # уже в hide(); первые шаги подбирают то, что могло появиться позже.
+    return (
+        partial(remove_batch, Comment.objects.filter(author_id=pk),
+                remove_comments),
+        partial(remove_batch, Review.objects.filter(author_id=pk),
+                remove_reviews),
+        partial(delete_batch, Comment.all_objects.filter(author_id=pk)),
+        partial(delete_batch, Comment.all_objects.filter(
+            review__author_id=pk)),
+        partial(delete_batch, Review.all_objects.filter(author_id=pk)),
+    )
+
+
+PLANS = {
+    Title._meta.label_lower: title_steps,
+    Genre._meta.label_lower: genre_steps,
+    Category._meta.label_lower: category_steps,
+    User._meta.label_lower: user_steps,
+}
+
+
+def hide(instance):
+    model = type(instance)
+    if model is User:
+        values = {'is_active': False}
+    else:
+        values = {'deleted_at': timezone.now()}
+    model._base_manager.filter(pk=instance.pk).update(**values)
+    for field, value in values.items():
+        setattr(instance, field, value)
+    if model is User:
+        # Отзывы и комментарии пропадают и перестают учитываться в
+        # рейтингах сразу; строки удаляются фоновым заданием.
+        remove_comments(Comment.objects.filter(author_id=instance.pk))
+        remove_reviews(Review.objects.filter(author_id=instance.pk))
+
+
+def schedule_deletion(instance):
+    """Скрывает объект и ставит удаление зависимых строк в очередь."""
+    model = type(instance)
+    with transaction.atomic():
+        hide(instance)
+        job = DeletionJob.objects.create(
+            target=model._meta.label_lower, object_id=instance.pk,
+            object_repr=str(instance)[:NAME_MAX_LENGTH])
+        enqueue(DELETION_REQUESTED, job_id=job.pk)
+        post_soft_delete.send(sender=model, instance=instance)
+    return job
+
+
+def run_step(job, batch_size):
+    """Выполняет одну порцию задания, последней удаляется сам объект."""
+    steps = PLANS[job.target](job.object_id)
+    while job.step < len(steps):
+        processed = steps[job.step](batch_size)
+        if processed:
+            job.processed += processed
+            break
+        job.step += 1
+    else:
+        model = apps.get_model(job.target)
+        model._base_manager.filter(pk=job.object_id).delete()
+        job.status = DeletionJob.DONE
+        job.finished_at = timezone.now()
+    job.save()
+
+
+@handler(DELETION_REQUESTED)
+def run_deletions(events):
+    # Каждое событие - одна порция; пока задание не завершено, в очередь
+    # ставится следующее событие, так что транзакции остаются короткими.
+    jobs = DeletionJob.objects.in_bulk(
+        [event.payload['job_id'] for event in events])
+    for job in jobs.values():
+        if job.status == DeletionJob.DONE:
+            continue
+        run_step(job, BATCH_SIZE)
+        if job.status != DeletionJob.DONE:
+            enqueue(DELETION_REQUESTED, job_id=job.pk)
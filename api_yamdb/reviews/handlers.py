@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.mail import EmailMessage, get_connection
+
+from .models import Comment, ScoreCount, Title, User
+from .outbox import handler
+
+SCORE_SHIFTED = 'score.shifted'
+COMMENT_CREATED = 'comment.created'
+CONFIRMATION_REQUESTED = 'confirmation.requested'
+
+
+@handler(SCORE_SHIFTED)
+def shift_score_counts(events):
+    """Переносит изменения оценок в гистограмму одним проходом."""
+    deltas = {}
+    for event in events:
+        key = (event.payload['title_id'], event.payload['score'])
+        deltas[key] = deltas.get(key, 0) + event.payload['delta']
+    existing = set(Title.objects.filter(
+        pk__in={title_id for title_id, _ in deltas}).values_list(
+            'pk', flat=True))
+    for (title_id, score), delta in deltas.items():
+        if delta and title_id in existing:
+            ScoreCount.objects.shift(title_id, score, delta)
+
+
+@handler(COMMENT_CREATED)
+def notify_review_authors(events):
+    """Сообщает авторам отзывов о новых комментариях.
+
+    Письма пачки уходят через одно соединение, но по одному: ошибка
+    доставки откладывает только своё событие, остальные письма
+    повторно не отправляются.
+    """
+    comments = Comment.objects.select_related(
+        'author', 'review__author', 'review__title').in_bulk(
+            [event.payload['comment_id'] for event in events])
+    errors = {}
+    with get_connection() as connection:
+        for event in events:
+            comment = comments.get(event.payload['comment_id'])
+            if comment is None or comment.author_id == (
+                    comment.review.author_id):
+                continue
+            message = EmailMessage(
+                'Новый комментарий к отзыву',
+                f'{comment.author.username} прокомментировал ваш отзыв '
+                f'на «{comment.review.title.name}»: {comment.text}',
+                settings.DEFAULT_FROM_EMAIL,
+                [comment.review.author.email],
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as error:
+                errors[event.pk] = repr(error)
+    return errors
+
+
+@handler(CONFIRMATION_REQUESTED)
+def send_confirmation_codes(events):
+    """Отправляет коды подтверждения через одно соединение на пачку.
+
+    Код создаётся при отправке, поэтому в очереди не хранится. Письма
+    отправляются по одному, чтобы ошибка доставки откладывала только
+    своё событие; на несколько запросов одного пользователя в пачке
+    уходит одно письмо.
+    """
+    users = User.objects.filter(is_active=True).in_bulk(
+        {event.payload['user_id'] for event in events})
+    errors = {}
+    sent = set()
+    with get_connection() as connection:
+        for event in events:
+            user = users.get(event.payload['user_id'])
+            if user is None or user.pk in sent:
+                continue
+            message = EmailMessage(
+                'Код подтверждения',
+                'Ваш код подтверждения: '
+                f'{default_token_generator.make_token(user)}',
+                settings.DEFAULT_FROM_EMAIL,
+                [user.email],
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as error:
+                errors[event.pk] = repr(error)
+            else:
+                sent.add(user.pk)
+    return errors
@@ -0,0 +1,185 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from reviews.sqlite import pragma_statements
+
+SCHEMA = """
+CREATE TABLE category (id INTEGER PRIMARY KEY, name TEXT NOT NULL);
+CREATE TABLE title (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    category_id INTEGER REFERENCES category (id),
+    score_sum INTEGER NOT NULL DEFAULT 0,
+    score_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE review (
+    id INTEGER PRIMARY KEY,
+    title_id INTEGER NOT NULL REFERENCES title (id),
+    author_id INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    pub_date REAL NOT NULL
+);
+CREATE INDEX review_title_pub_date_idx ON review (title_id, pub_date DESC);
+"""
+
+TITLE_PAGE = """
+SELECT title.id, title.name, title.year, category.name,
+       title.score_sum * 1.0 / NULLIF(title.score_count, 0)
+FROM title LEFT JOIN category ON category.id = title.category_id
+WHERE title.id > ? ORDER BY title.id LIMIT 10
+"""
+REVIEW_PAGE = """
+SELECT id, author_id, text, score, pub_date FROM review
+WHERE title_id = ? ORDER BY pub_date DESC LIMIT 10
+"""
+
+
+class Profile:
+    """Способ работы с базой: набор PRAGMA и время жизни соединения."""
+
+    def __init__(self, name, pragmas, persistent, isolation_level):
+        self.name = name
+        self.pragmas = pragmas
+        self.persistent = persistent
+        self.isolation_level = isolation_level
+
+    def connect(self, path):
+        connection = sqlite3.connect(
+            path, timeout=5, isolation_level=self.isolation_level,
+            check_same_thread=False)
+        for statement in pragma_statements(self.pragmas):
+            connection.execute(statement)
+        return connection
+
+
+PROFILES = (
+    # Как до настройки: соединение на каждый запрос, PRAGMA по умолчанию.
+    Profile('default', {}, persistent=False, isolation_level='DEFERRED'),
+    Profile('tuned', settings.SQLITE_PRAGMAS, persistent=True,
+            isolation_level='IMMEDIATE'),
+)
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает пропускную способность SQLite с настройками по '
+            'умолчанию и с профилем SQLITE_PRAGMAS на синтетических данных')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=2000)
+        parser.add_argument('--reviews', type=int, default=50000)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument(
+            '--duration', type=float, default=5,
+            help='Длительность замера для каждого профиля, в секундах')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.stdout.write(
+            f'{"Профиль":<10}{"чтений/с":>12}{"записей/с":>12}'
+            f'{"locked":>10}')
+        for profile in PROFILES:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'benchmark.sqlite3')
+                self.populate(path)
+                reads, writes, locked = self.measure(profile, path)
+            duration = options['duration']
+            self.stdout.write(
+                f'{profile.name:<10}{reads / duration:>12.0f}'
+                f'{writes / duration:>12.0f}{locked:>10}')
+
+    def populate(self, path):
+        titles, reviews = self.options['titles'], self.options['reviews']
+        connection = sqlite3.connect(path)
+        rng = random.Random(0)
+        with connection:
+            connection.executescript(SCHEMA)
+            connection.executemany(
+                'INSERT INTO category (id, name) VALUES (?, ?)',
+                ((idx, f'Категория {idx}') for idx in range(1, 11)))
+            connection.executemany(
+                'INSERT INTO title (id, name, year, category_id) '
+                'VALUES (?, ?, ?, ?)',
+                ((idx, f'Произведение {idx}', 1900 + idx % 120, idx % 10 + 1)
+                 for idx in range(1, titles + 1)))
+            connection.executemany(
+                'INSERT INTO review (title_id, author_id, text, score, '
+                'pub_date) VALUES (?, ?, ?, ?, ?)',
+                ((rng.randint(1, titles), rng.randint(1, 10000),
+                  'Текст отзыва ' * 10, rng.randint(1, 10), float(idx))
+                 for idx in range(reviews)))
+        connection.close()
+
+    def measure(self, profile, path):
+        stop = threading.Event()
+        counts = {'reads': 0, 'writes': 0, 'locked': 0}
+        lock = threading.Lock()
+
+        def run(kind, operation):
+            rng = random.Random()
+            connection = profile.connect(path) if profile.persistent else None
+            done = locked = 0
+            while not stop.is_set():
+                current = connection or profile.connect(path)
+                try:
+                    operation(current, rng)
+                    done += 1
+                except sqlite3.OperationalError as error:
+                    if 'locked' not in str(error):
+                        raise
+                    locked += 1
+                finally:
+                    if connection is None:
+                        current.close()
+            if connection is not None:
+                connection.close()
+            with lock:
+                counts[kind] += done
+                counts['locked'] += locked
+
+        threads = [
+            threading.Thread(target=run, args=('reads', self.read))
+            for _ in range(self.options['readers'])
+        ] + [
+            threading.Thread(target=run, args=('writes', self.write))
+            for _ in range(self.options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(self.options['duration'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return counts['reads'], counts['writes'], counts['locked']
+
+    def read(self, connection, rng):
+        titles = self.options['titles']
+        connection.execute(
+            TITLE_PAGE, (rng.randint(0, max(titles - 10, 0)),)).fetchall()
+        connection.execute(
+            REVIEW_PAGE, (rng.randint(1, titles),)).fetchall()
+
+    def write(self, connection, rng):
+        # Как POST отзыва: строка отзыва и сдвиг счётчиков произведения
+        # в одной транзакции.
+        title_id = rng.randint(1, self.options['titles'])
+        score = rng.randint(1, 10)
+        with connection:
+            connection.execute(
+                'INSERT INTO review (title_id, author_id, text, score, '
+                'pub_date) VALUES (?, ?, ?, ?, ?)',
+                (title_id, rng.randint(1, 10000), 'Новый отзыв', score,
+                 time.time()))
+            connection.execute(
+                'UPDATE title SET score_sum = score_sum + ?, '
+                'score_count = score_count + 1 WHERE id = ?',
+                (score, title_id))
@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reviews import outbox
+
+
+class Command(BaseCommand):
+    help = 'Обрабатывает очередь событий (outbox) пачками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int,
+                            default=outbox.BATCH_SIZE)
+        parser.add_argument('--max-attempts', type=int,
+                            default=outbox.MAX_ATTEMPTS)
+        parser.add_argument(
+            '--event-type', action='append', dest='event_types',
+            help='Обрабатывать только события этого типа (можно повторять)')
+        parser.add_argument(
+            '--sleep', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста')
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать готовые события и завершиться')
+        parser.add_argument(
+            '--stats', action='store_true',
+            help='Показать глубину очереди и задержку и завершиться')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.write_stats()
+            return
+        processed = 0
+        while True:
+            amount = outbox.process_batch(
+                options['batch_size'], options['max_attempts'],
+                options['event_types'])
+            processed += amount
+            if amount:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['sleep'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано событий: {processed}.'))
+        self.write_stats()
+
+    def write_stats(self):
+        stats = outbox.stats()
+        self.stdout.write(
+            f'В очереди: {stats["depth"]}, '
+            f'не доставлено: {stats["failed"]}, '
+            f'задержка: {stats["lag_seconds"]:.1f} с.')
@@ -0,0 +1,64 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from reviews.models import Comment, IssuedToken, RateLimitBucket, Review
+from reviews.signals import signals_suspended
+
+BUCKET_IDLE_SECONDS = 24 * 60 * 60
+
+
+class Command(BaseCommand):
+    help = ('Удаляет из базы отзывы и комментарии, помеченные удалёнными, '
+            'истёкшие токены и заполненные корзины ограничителя частоты '
+            'небольшими порциями')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument(
+            '--older-than', type=int, default=0,
+            help='Удалять только помеченные раньше, чем N минут назад')
+        parser.add_argument(
+            '--sleep', type=float, default=0,
+            help='Пауза в секундах между порциями, чтобы не занимать '
+                 'блокировку записи')
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.sleep = options['sleep']
+        cutoff = timezone.now() - timedelta(minutes=options['older_than'])
+        # Комментарии удалённых отзывов помечены вместе с отзывом, поэтому
+        # к моменту удаления отзывов каскаду уже нечего удалять.
+        comments = self.purge(
+            Comment.all_objects.filter(deleted_at__lte=cutoff), 'deleted_at')
+        reviews = self.purge(
+            Review.all_objects.filter(deleted_at__lte=cutoff), 'deleted_at')
+        tokens = self.purge(
+            IssuedToken.objects.filter(expires_at__lte=timezone.now()),
+            'expires_at')
+        # Корзина, не менявшаяся дольше самого длинного периода частоты
+        # (сутки), уже полна и равносильна отсутствующей.
+        buckets = self.purge(
+            RateLimitBucket.objects.filter(
+                updated_at__lt=time.time() - BUCKET_IDLE_SECONDS),
+            'pk')
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено: отзывы - {reviews}, комментарии - {comments}, '
+            f'токены - {tokens}, корзины - {buckets}.'))
+
+    def purge(self, queryset, ordering):
+        purged = 0
+        while True:
+            ids = list(queryset.order_by(ordering).values_list(
+                'pk', flat=True)[:self.batch_size])
+            if not ids:
+                return purged
+            # Счётчики скорректированы при пометке, сигналы не нужны.
+            with transaction.atomic(), signals_suspended():
+                queryset.model._base_manager.filter(pk__in=ids).delete()
+            purged += len(ids)
+            if self.sleep:
+                time.sleep(self.sleep)
@@ -0,0 +1,140 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from reviews import outbox
+from reviews.handlers import SCORE_SHIFTED
+from reviews.models import Comment, OutboxEvent, Review, ScoreCount, Title
+
+
+class Command(BaseCommand):
+    help = ('Сверяет хранимые счётчики произведений и отзывов с данными '
+            'и исправляет расхождения')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только сообщить о расхождениях, не исправляя их')
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.dry_run = options['dry_run']
+        # Гистограммы оценок обновляются через очередь событий. Перед
+        # исправлением дочитываются только события оценок: письма и
+        # задания удаления остаются воркеру. При проверке очередь не
+        # трогается, а ожидающие сдвиги учитываются при сравнении.
+        self.pending_shifts = {}
+        if self.dry_run:
+            self.pending_shifts = self.get_pending_shifts()
+        else:
+            while outbox.process_batch(
+                    self.batch_size, event_types=[SCORE_SHIFTED]):
+                pass
+        titles = self.repair_titles()
+        reviews = self.repair_reviews()
+        action = 'Найдено' if self.dry_run else 'Исправлено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} расхождений: произведения - {titles}, '
+            f'отзывы - {reviews}.'))
+
+    def get_pending_shifts(self):
+        shifts = {}
+        for payload in OutboxEvent.objects.filter(
+                event_type=SCORE_SHIFTED, failed=False).values_list(
+                    'payload', flat=True).iterator():
+            histogram = shifts.setdefault(payload['title_id'], {})
+            histogram[payload['score']] = histogram.get(
+                payload['score'], 0) + payload['delta']
+        return shifts
+
+    def batches(self, model):
+        last_id = 0
+        while True:
+            ids = list(model.objects.filter(pk__gt=last_id).order_by(
+                'pk').values_list('pk', flat=True)[:self.batch_size])
+            if not ids:
+                return
+            yield ids
+            last_id = ids[-1]
+
+    def repair_titles(self):
+        repaired = 0
+        for ids in self.batches(Title):
+            with transaction.atomic():
+                titles = list(Title.objects.filter(pk__in=ids).only(
+                    'score_sum', 'score_count', 'rating'
+                ).select_for_update())
+                reviews = Review.objects.filter(title_id__in=ids).order_by()
+                totals = {
+                    row['title_id']: (row['total'], row['amount'])
+                    for row in reviews.values('title_id').annotate(
+                        total=Sum('score'), amount=Count('id'))
+                }
+                actual_buckets = {}
+                for title_id, score, amount in reviews.values(
+                        'title_id', 'score').annotate(
+                            amount=Count('id')).values_list(
+                                'title_id', 'score', 'amount'):
+                    actual_buckets.setdefault(title_id, {})[score] = amount
+                buckets = {}
+                for title_id, score, amount in ScoreCount.objects.filter(
+                        title_id__in=ids, count__gt=0).values_list(
+                            'title_id', 'score', 'count'):
+                    buckets.setdefault(title_id, {})[score] = amount
+                for title_id in ids:
+                    histogram = buckets.setdefault(title_id, {})
+                    for score, delta in self.pending_shifts.get(
+                            title_id, {}).items():
+                        histogram[score] = histogram.get(score, 0) + delta
+                        if not histogram[score]:
+                            del histogram[score]
+
+                for title in titles:
+                    total, amount = totals.get(title.pk, (0, 0))
+                    rating = total / amount if amount else None
+                    histogram = actual_buckets.get(title.pk, {})
+                    if (
+                        (title.score_sum, title.score_count, title.rating)
+                        == (total, amount, rating)
+                        and buckets.get(title.pk, {}) == histogram
+                    ):
+                        continue
+                    repaired += 1
+                    self.stderr.write(
+                        f'[Title] id={title.pk}: {title.score_sum}/'
+                        f'{title.score_count} вместо {total}/{amount}')
+                    if self.dry_run:
+                        continue
+                    Title.objects.filter(pk=title.pk).update(
+                        score_sum=total, score_count=amount, rating=rating)
+                    ScoreCount.objects.filter(title_id=title.pk).delete()
+                    ScoreCount.objects.bulk_create(
+                        ScoreCount(title_id=title.pk, score=score,
+                                   count=count)
+                        for score, count in histogram.items())
+        return repaired
+
+    def repair_reviews(self):
+        repaired = 0
+        for ids in self.batches(Review):
+            with transaction.atomic():
+                stored_counts = list(Review.objects.filter(
+                    pk__in=ids).select_for_update().values_list(
+                        'pk', 'comment_count'))
+                counts = dict(
+                    Comment.objects.filter(review_id__in=ids).values(
+                        'review_id').annotate(amount=Count('id')).order_by(
+                    ).values_list('review_id', 'amount'))
+                for review_id, stored in stored_counts:
+                    actual = counts.get(review_id, 0)
+                    if stored == actual:
+                        continue
+                    repaired += 1
+                    self.stderr.write(
+                        f'[Review] id={review_id}: {stored} комментариев '
+                        f'вместо {actual}')
+                    if not self.dry_run:
+                        Review.objects.filter(pk=review_id).update(
+                            comment_count=actual)
+        return repaired
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.1 on 2026-10-17 03:54
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_title_scores(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    totals = Title.objects.annotate(
+        total=Sum('reviews__score'), amount=Count('reviews'))
+    for title in totals.filter(amount__gt=0).iterator():
+        Title.objects.filter(pk=title.pk).update(
+            score_sum=title.total,
+            score_count=title.amount,
+            rating=title.total / title.amount,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0014_alter_category_options_alter_genre_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Число оценок'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-rating', '-id'], name='title_rating_idx'),
+        ),
+        migrations.RunPython(fill_title_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.1 on 2026-10-17 03:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_score_counts(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    ScoreCount = apps.get_model('reviews', 'ScoreCount')
+    buckets = Review.objects.values('title_id', 'score').annotate(
+        amount=Count('id')).order_by()
+    ScoreCount.objects.bulk_create(
+        ScoreCount(title_id=bucket['title_id'], score=bucket['score'],
+                   count=bucket['amount'])
+        for bucket in buckets.iterator()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0015_title_score_sum_title_score_count_title_rating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveSmallIntegerField(verbose_name='Оценка')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Число отзывов')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_counts', to='reviews.title')),
+            ],
+            options={
+                'verbose_name': 'Распределение оценок',
+                'verbose_name_plural': 'Распределения оценок',
+                'constraints': [models.UniqueConstraint(fields=('title', 'score'), name='unique_score_count_per_title')],
+            },
+        ),
+        migrations.RunPython(fill_score_counts, migrations.RunPython.noop),
+    ]
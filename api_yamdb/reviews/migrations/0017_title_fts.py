@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from reviews.search import drop_title_search, install_title_search
+
+
+def create_title_search(apps, schema_editor):
+    install_title_search(schema_editor.connection)
+
+
+def remove_title_search(apps, schema_editor):
+    drop_title_search(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0016_scorecount'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_title_search, remove_title_search),
+    ]
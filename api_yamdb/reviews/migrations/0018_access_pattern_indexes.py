@@ -0,0 +1,45 @@
+# Generated by Django 5.1.1 on 2026-10-17 04:04
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicate_genre_links(apps, schema_editor):
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    keep_ids = GenreTitle.objects.values('genre_id', 'title_id').annotate(
+        keep_id=Min('id')).values('keep_id')
+    GenreTitle.objects.filter(
+        genre__isnull=False, title__isnull=False
+    ).exclude(id__in=keep_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0017_title_fts'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='comment',
+            options={'default_related_name': 'comments', 'ordering': ('pub_date',), 'verbose_name': 'Комметарий', 'verbose_name_plural': 'Комментарии'},
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['review', 'pub_date'], name='comment_review_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['title', '-pub_date', '-score'], name='review_title_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', 'year'], name='title_category_year_idx'),
+        ),
+        migrations.RunPython(remove_duplicate_genre_links,
+                             migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='genretitle',
+            constraint=models.UniqueConstraint(fields=('genre', 'title'), name='unique_genre_per_title'),
+        ),
+    ]
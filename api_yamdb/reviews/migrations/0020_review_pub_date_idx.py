@@ -0,0 +1,17 @@
+# Generated by Django 5.1.1 on 2026-10-17 04:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0019_review_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['-pub_date', '-id'], name='review_pub_date_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.1 on 2026-10-17 04:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0020_review_pub_date_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(max_length=64, verbose_name='Тип события')),
+                ('payload', models.JSONField(default=dict, verbose_name='Данные')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создано')),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Доступно с')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попытки')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+                ('failed', models.BooleanField(default=False, verbose_name='Не доставлено')),
+                ('claim', models.CharField(blank=True, max_length=32, verbose_name='Метка обработчика')),
+            ],
+            options={
+                'verbose_name': 'Событие',
+                'verbose_name_plural': 'События',
+                'ordering': ('id',),
+                'indexes': [models.Index(condition=models.Q(('failed', False)), fields=['available_at', 'id'], name='outbox_pending_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.1.1 on 2026-10-17 04:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0022_author_pub_date_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='review',
+            name='unique_review_per_title_and_author',
+        ),
+        migrations.RemoveIndex(
+            model_name='comment',
+            name='comment_review_pub_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='comment',
+            name='comment_author_pub_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='review',
+            name='review_title_pub_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='review',
+            name='review_pub_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='review',
+            name='review_author_pub_date_idx',
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Дата удаления'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Дата удаления'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['review', 'pub_date'], name='comment_review_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['author', '-pub_date', '-id'], name='comment_author_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='comment_deleted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['title', '-pub_date', '-score'], name='review_title_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['-pub_date', '-id'], name='review_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['author', '-pub_date', '-id'], name='review_author_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='review_deleted_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(condition=models.Q(('deleted_at__isnull', True)), fields=('title', 'author'), name='unique_review_per_title_and_author'),
+        ),
+    ]
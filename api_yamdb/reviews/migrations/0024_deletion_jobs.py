@@ -0,0 +1,63 @@
+# Generated by Django 5.1.1 on 2026-10-17 04:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0023_soft_delete'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletionJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('target', models.CharField(max_length=64, verbose_name='Модель')),
+                ('object_id', models.BigIntegerField(verbose_name='id объекта')),
+                ('object_repr', models.CharField(max_length=256, verbose_name='Объект')),
+                ('status', models.CharField(choices=[('pending', 'Выполняется'), ('done', 'Завершено')], default='pending', max_length=7, verbose_name='Статус')),
+                ('step', models.PositiveSmallIntegerField(default=0, verbose_name='Шаг')),
+                ('processed', models.PositiveIntegerField(default=0, verbose_name='Обработано')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создано')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Завершено')),
+            ],
+            options={
+                'verbose_name': 'Удаление',
+                'verbose_name_plural': 'Удаления',
+                'ordering': ('-id',),
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='title',
+            name='title_rating_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='title',
+            name='title_category_year_idx',
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Дата удаления'),
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Дата удаления'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Дата удаления'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['-rating', '-id'], name='title_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['category', 'year'], name='title_category_year_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.1 on 2026-10-17 04:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0024_deletion_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssuedToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jti', models.CharField(max_length=64, unique=True, verbose_name='Идентификатор токена')),
+                ('expires_at', models.DateTimeField(verbose_name='Действует до')),
+                ('revoked_at', models.DateTimeField(blank=True, null=True, verbose_name='Отозван')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='issued_tokens', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Токен',
+                'verbose_name_plural': 'Токены',
+                'indexes': [models.Index(fields=['expires_at'], name='token_expires_idx'), models.Index(condition=models.Q(('revoked_at__isnull', True)), fields=['user', 'expires_at'], name='token_active_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.1 on 2026-10-17 04:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0025_issued_tokens'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateLimitBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255, unique=True, verbose_name='Ключ')),
+                ('tokens', models.FloatField(verbose_name='Доступно запросов')),
+                ('updated_at', models.FloatField(verbose_name='Обновлено')),
+            ],
+            options={
+                'verbose_name': 'Ограничение частоты',
+                'verbose_name_plural': 'Ограничения частоты',
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.1 on 2026-10-17 05:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0026_rate_limit_buckets'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='title',
+            name='title_category_year_idx',
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['category', '-rating', '-id'], name='title_category_rating_idx'),
+        ),
+    ]
@@ -1,6 +1,10 @@
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Cast
+from django.dispatch import Signal
+from django.utils import timezone
 
 from .validators import validate_year
 
@@ -9,6 +13,12 @@ NAME_MAX_LENGTH = 256
 SCORE_MIN_VALUE = 1
 SCORE_MAX_VALUE = 10
 
+# Отправляется после того, как объект помечен удалённым.
+post_soft_delete = Signal()
+# То же для набора объектов: removed - словарь {id: id родителя}, для
+# комментариев также title_ids - id произведений их отзывов.
+post_bulk_soft_delete = Signal()
+
 
 class User(AbstractUser):
     USER = 'user'
@@ -38,12 +48,104 @@ class User(AbstractUser):
         return self.role == self.MODERATOR
 
 
-class NamedSlugModel(models.Model):
+def shift_by_pk(deltas):
+    """Выражение со сдвигом счётчика для каждого первичного ключа."""
+    if len(deltas) == 1:
+        return Value(next(iter(deltas.values())))
+    return Case(
+        *(When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()),
+        default=Value(0),
+    )
+
+
+class CountedModel(models.Model):
+    """Модель со счётчиками, которые меняются только через F-выражения.
+
+    При обновлении объекта счётчики из ``counter_fields`` не
+    записываются, чтобы не затереть значения, изменённые параллельными
+    запросами после загрузки объекта.
+    """
+
+    counter_fields = ()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.get_protected_fields()
+                and field.attname not in self.get_deferred_fields()
+            ]
+        super().save(*args, **kwargs)
+
+    def get_protected_fields(self):
+        return self.counter_fields
+
+
+class LiveManager(models.Manager):
+    """Менеджер, скрывающий строки, помеченные удалёнными."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
+class HiddenModel(CountedModel):
+    """Модель, строки которой можно скрыть пометкой ``deleted_at``.
+
+    Помеченные строки скрывает менеджер по умолчанию, все строки
+    доступны через ``all_objects``.
+    """
+
+    deleted_at = models.DateTimeField(verbose_name='Дата удаления',
+                                      blank=True, null=True, editable=False)
+
+    all_objects = models.Manager()
+
+    class Meta:
+        abstract = True
+
+    def get_protected_fields(self):
+        # Пометку ставит только удаление, save() её не перезаписывает.
+        return (*super().get_protected_fields(), 'deleted_at')
+
+
+class SoftDeleteModel(HiddenModel):
+    """Модель, удаление которой только помечает строку.
+
+    Из базы помеченные строки небольшими порциями удаляет команда
+    ``purge_deleted``. Счётчики и версии кэша обновляют обработчики
+    сигнала ``post_soft_delete``.
+    """
+
+    class Meta:
+        abstract = True
+
+    def delete(self, using=None, keep_parents=False):
+        with transaction.atomic(using=using):
+            deleted_at = timezone.now()
+            marked = type(self).objects.filter(pk=self.pk).update(
+                deleted_at=deleted_at)
+            if marked:
+                self.deleted_at = deleted_at
+                self.delete_related()
+                post_soft_delete.send(sender=type(self), instance=self)
+        return marked, {self._meta.label: marked}
+
+    def delete_related(self):
+        """Помечает удалёнными зависимые объекты."""
+
+
+class NamedSlugModel(HiddenModel):
     name = models.CharField(verbose_name='Наименование',
                             max_length=NAME_MAX_LENGTH)
     slug = models.CharField(verbose_name='URL slug',
                             unique=True, max_length=SLUG_MAX_LENGTH)
 
+    objects = LiveManager()
+
     class Meta:
         abstract = True
         ordering = ['name', 'slug']
@@ -64,7 +166,35 @@ class Genre(NamedSlugModel):
         verbose_name_plural = 'Жанры'
 
 
-class Title(models.Model):
+class TitleManager(LiveManager):
+
+    def apply_score(self, title_id, score_delta, count_delta):
+        """Атомарно сдвигает сумму и число оценок и пересчитывает рейтинг."""
+        self.apply_scores({title_id: (score_delta, count_delta)})
+
+    def apply_scores(self, deltas):
+        """То же для нескольких произведений: {id: (сумма, число)}.
+
+        Все произведения обновляются двумя запросами.
+        """
+        if not deltas:
+            return
+        with transaction.atomic():
+            titles = self.filter(pk__in=deltas)
+            titles.update(
+                score_sum=F('score_sum') + shift_by_pk(
+                    {pk: delta[0] for pk, delta in deltas.items()}),
+                score_count=F('score_count') + shift_by_pk(
+                    {pk: delta[1] for pk, delta in deltas.items()}),
+            )
+            titles.update(rating=Case(
+                When(score_count=0, then=None),
+                default=(Cast('score_sum', FloatField())
+                         / F('score_count')),
+            ))
+
+
+class Title(HiddenModel):
     name = models.CharField(verbose_name='Наименование',
                             max_length=NAME_MAX_LENGTH)
     year = models.SmallIntegerField(verbose_name='Год',
@@ -76,11 +206,28 @@ class Title(models.Model):
                                  blank=True, null=True, related_name='titles')
     description = models.TextField(verbose_name='Описание', blank=True,
                                    null=True)
+    score_sum = models.PositiveIntegerField(verbose_name='Сумма оценок',
+                                            default=0, editable=False)
+    score_count = models.PositiveIntegerField(verbose_name='Число оценок',
+                                              default=0, editable=False)
+    rating = models.FloatField(verbose_name='Рейтинг', blank=True,
+                               null=True, editable=False)
+
+    objects = TitleManager()
+
+    counter_fields = ('score_sum', 'score_count', 'rating')
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ['-year']
+        indexes = [
+            models.Index(fields=['-rating', '-id'], name='title_rating_idx',
+                         condition=Q(deleted_at__isnull=True)),
+            models.Index(fields=['category', '-rating', '-id'],
+                         name='title_category_rating_idx',
+                         condition=Q(deleted_at__isnull=True)),
+        ]
 
 
 class GenreTitle(models.Model):
@@ -89,8 +236,71 @@ class GenreTitle(models.Model):
     genre = models.ForeignKey(Genre, on_delete=models.SET_NULL,
                               blank=True, null=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['genre', 'title'],
+                name='unique_genre_per_title'
+            )
+        ]
+
+
+class ScoreCountManager(models.Manager):
+
+    def shift(self, title_id, score, delta):
+        """Атомарно меняет число отзывов с оценкой score у произведения."""
+        with transaction.atomic():
+            updated = self.filter(title_id=title_id, score=score).update(
+                count=F('count') + delta)
+            if not updated and delta > 0:
+                self.bulk_create(
+                    [self.model(title_id=title_id, score=score)],
+                    ignore_conflicts=True)
+                self.filter(title_id=title_id, score=score).update(
+                    count=F('count') + delta)
 
-class Review(models.Model):
+    def histogram(self, title_id):
+        counts = dict(
+            self.filter(title_id=title_id).values_list('score', 'count'))
+        return {
+            score: counts.get(score, 0)
+            for score in range(SCORE_MIN_VALUE, SCORE_MAX_VALUE + 1)
+        }
+
+
+class ScoreCount(models.Model):
+    title = models.ForeignKey(Title, on_delete=models.CASCADE,
+                              related_name='score_counts')
+    score = models.PositiveSmallIntegerField(verbose_name='Оценка')
+    count = models.PositiveIntegerField(verbose_name='Число отзывов',
+                                        default=0)
+
+    objects = ScoreCountManager()
+
+    class Meta:
+        verbose_name = 'Распределение оценок'
+        verbose_name_plural = 'Распределения оценок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'score'],
+                name='unique_score_count_per_title'
+            )
+        ]
+
+
+class ReviewManager(LiveManager):
+
+    def shift_comment_count(self, review_id, delta):
+        self.shift_comment_counts({review_id: delta})
+
+    def shift_comment_counts(self, deltas):
+        """Сдвигает счётчики комментариев отзывов одним запросом."""
+        if deltas:
+            self.filter(pk__in=deltas).update(
+                comment_count=F('comment_count') + shift_by_pk(deltas))
+
+
+class Review(SoftDeleteModel):
     title = models.ForeignKey(Title, on_delete=models.CASCADE)
     text = models.TextField()
     author = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -99,27 +309,234 @@ class Review(models.Model):
         MaxValueValidator(SCORE_MAX_VALUE)
     ])
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
+    comment_count = models.PositiveIntegerField(
+        verbose_name='Число комментариев', default=0, editable=False)
+
+    objects = ReviewManager()
+
+    counter_fields = ('comment_count',)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем загруженные значения, чтобы при сохранении
+        # скорректировать рейтинг произведения на разницу оценок.
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def refresh_counted_values(self):
+        """Перечитывает сохранённые произведение и оценку.
+
+        Вызывается внутри транзакции записи: значения, загруженные до
+        неё, могли устареть из-за параллельной правки, и поправка
+        рейтинга на их основе посчиталась бы дважды. Блокировка строки
+        (в SQLite - транзакцией IMMEDIATE) держится до конца записи.
+        """
+        stored = type(self)._base_manager.select_for_update().filter(
+            pk=self.pk).values('title_id', 'score').first()
+        if stored is not None:
+            self._loaded_values = stored
+        return stored
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            if not self._state.adding:
+                self.refresh_counted_values()
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            stored = self.refresh_counted_values()
+            if stored is not None:
+                # Из рейтинга вычитается сохранённая оценка.
+                self.title_id, self.score = (
+                    stored['title_id'], stored['score'])
+            return super().delete(*args, **kwargs)
+
+    def delete_related(self):
+        Comment.objects.filter(review_id=self.pk).update(
+            deleted_at=self.deleted_at)
 
     class Meta:
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         default_related_name = 'reviews'
         ordering = ('-pub_date', '-score')
+        indexes = [
+            models.Index(fields=['title', '-pub_date', '-score'],
+                         name='review_title_pub_date_idx',
+                         condition=Q(deleted_at__isnull=True)),
+            models.Index(fields=['-pub_date', '-id'],
+                         name='review_pub_date_idx',
+                         condition=Q(deleted_at__isnull=True)),
+            models.Index(fields=['author', '-pub_date', '-id'],
+                         name='review_author_pub_date_idx',
+                         condition=Q(deleted_at__isnull=True)),
+            models.Index(fields=['deleted_at'], name='review_deleted_idx',
+                         condition=Q(deleted_at__isnull=False)),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['title', 'author'],
-                name='unique_review_per_title_and_author'
+                name='unique_review_per_title_and_author',
+                condition=Q(deleted_at__isnull=True),
             )
         ]
 
 
-class Comment(models.Model):
+class Comment(SoftDeleteModel):
     review = models.ForeignKey(Review, on_delete=models.CASCADE)
     text = models.TextField()
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
 
+    objects = LiveManager()
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = 'Комметарий'
         verbose_name_plural = 'Комментарии'
         default_related_name = 'comments'
+        ordering = ('pub_date',)
+        indexes = [
+            models.Index(fields=['review', 'pub_date'],
+                         name='comment_review_pub_date_idx',
+                         condition=Q(deleted_at__isnull=True)),
+            models.Index(fields=['author', '-pub_date', '-id'],
+                         name='comment_author_pub_date_idx',
+                         condition=Q(deleted_at__isnull=True)),
+            models.Index(fields=['deleted_at'], name='comment_deleted_idx',
+                         condition=Q(deleted_at__isnull=False)),
+        ]
+
+
+class OutboxEvent(models.Model):
+    """Событие, записанное в одной транзакции с изменением данных.
+
+    Фоновый обработчик (``manage.py process_outbox``) забирает события
+    пачками и удаляет их после успешной обработки. Неудачные попытки
+    откладываются с растущей задержкой, после исчерпания попыток
+    событие помечается как ``failed`` и больше не выбирается.
+    """
+
+    event_type = models.CharField(verbose_name='Тип события', max_length=64)
+    payload = models.JSONField(verbose_name='Данные', default=dict)
+    created_at = models.DateTimeField(verbose_name='Создано',
+                                      auto_now_add=True)
+    available_at = models.DateTimeField(verbose_name='Доступно с',
+                                        default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(verbose_name='Попытки',
+                                                default=0)
+    last_error = models.TextField(verbose_name='Последняя ошибка',
+                                  blank=True)
+    failed = models.BooleanField(verbose_name='Не доставлено',
+                                 default=False)
+    claim = models.CharField(verbose_name='Метка обработчика',
+                             max_length=32, blank=True)
+
+    class Meta:
+        verbose_name = 'Событие'
+        verbose_name_plural = 'События'
+        ordering = ('id',)
+        indexes = [
+            models.Index(fields=['available_at', 'id'],
+                         name='outbox_pending_idx',
+                         condition=Q(failed=False)),
+        ]
+
+    def __str__(self):
+        return f'{self.event_type} #{self.pk}'
+
+
+class DeletionJob(models.Model):
+    """Фоновое удаление объекта со всеми зависимыми строками.
+
+    Объект скрывается сразу, а зависимые строки удаляются порциями
+    обработчиком очереди событий. ``step`` - номер текущего шага,
+    ``processed`` - число обработанных строк.
+    """
+
+    PENDING = 'pending'
+    DONE = 'done'
+
+    STATUS_CHOICES = (
+        (PENDING, 'Выполняется'),
+        (DONE, 'Завершено'),
+    )
+
+    target = models.CharField(verbose_name='Модель', max_length=64)
+    object_id = models.BigIntegerField(verbose_name='id объекта')
+    object_repr = models.CharField(verbose_name='Объект',
+                                   max_length=NAME_MAX_LENGTH)
+    status = models.CharField(
+        verbose_name='Статус',
+        max_length=max(len(status) for status, _ in STATUS_CHOICES),
+        choices=STATUS_CHOICES, default=PENDING)
+    step = models.PositiveSmallIntegerField(verbose_name='Шаг', default=0)
+    processed = models.PositiveIntegerField(verbose_name='Обработано',
+                                            default=0)
+    created_at = models.DateTimeField(verbose_name='Создано',
+                                      auto_now_add=True)
+    finished_at = models.DateTimeField(verbose_name='Завершено',
+                                       blank=True, null=True)
+
+    class Meta:
+        verbose_name = 'Удаление'
+        verbose_name_plural = 'Удаления'
+        ordering = ('-id',)
+
+    def __str__(self):
+        return f'{self.target} #{self.object_id}'
+
+
+class IssuedToken(models.Model):
+    """Выданный токен, который можно отозвать до истечения срока.
+
+    Строки хранятся до ``expires_at``: после этого токен отклоняется и
+    без списка отзыва. Строка токена обновления удаляется, когда по нему
+    выдана новая пара токенов.
+    """
+
+    jti = models.CharField(verbose_name='Идентификатор токена',
+                           max_length=64, unique=True)
+    user = models.ForeignKey(
+        User, verbose_name='Пользователь', on_delete=models.SET_NULL,
+        related_name='issued_tokens', blank=True, null=True)
+    expires_at = models.DateTimeField(verbose_name='Действует до')
+    revoked_at = models.DateTimeField(verbose_name='Отозван',
+                                      blank=True, null=True)
+
+    class Meta:
+        verbose_name = 'Токен'
+        verbose_name_plural = 'Токены'
+        indexes = [
+            models.Index(fields=['expires_at'], name='token_expires_idx'),
+            models.Index(fields=['user', 'expires_at'],
+                         name='token_active_idx',
+                         condition=Q(revoked_at__isnull=True)),
+        ]
+
+    def __str__(self):
+        return self.jti
+
+
+class RateLimitBucket(models.Model):
+    """Корзина токенов ограничителя частоты запросов.
+
+    ``tokens`` - число доступных запросов на момент ``updated_at``
+    (секунды эпохи Unix), пополнение вычисляется при следующем запросе.
+    """
+
+    key = models.CharField(verbose_name='Ключ', max_length=255, unique=True)
+    tokens = models.FloatField(verbose_name='Доступно запросов')
+    updated_at = models.FloatField(verbose_name='Обновлено')
+
+    class Meta:
+        verbose_name = 'Ограничение частоты'
+        verbose_name_plural = 'Ограничения частоты'
+
+    def __str__(self):
+        return self.key
@@ -0,0 +1,62 @@
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+
+from .handlers import SCORE_SHIFTED
+from .models import Comment, Review, Title, post_bulk_soft_delete
+from .outbox import enqueue_many
+
+
+def remove_reviews(queryset):
+    """Помечает удалёнными отзывы выборки вместе с их комментариями.
+
+    Счётчики произведений сдвигаются на сумму изменений одним запросом
+    вместо обработки каждого отзыва сигналами. Возвращает словарь
+    ``{id отзыва: id произведения}`` и список id удалённых комментариев.
+    """
+    with transaction.atomic():
+        rows = list(queryset.order_by().values_list(
+            'pk', 'title_id', 'score'))
+        if not rows:
+            return {}, []
+        removed = {pk: title_id for pk, title_id, _ in rows}
+        comments = Comment.objects.filter(review_id__in=removed)
+        comment_ids = list(comments.values_list('pk', flat=True))
+        deleted_at = timezone.now()
+        comments.update(deleted_at=deleted_at)
+        Review.objects.filter(pk__in=removed).update(deleted_at=deleted_at)
+
+        deltas = {}
+        for _, title_id, score in rows:
+            total, amount = deltas.get(title_id, (0, 0))
+            deltas[title_id] = (total - score, amount - 1)
+        Title.objects.apply_scores(deltas)
+        buckets = Counter((title_id, score) for _, title_id, score in rows)
+        enqueue_many(SCORE_SHIFTED, (
+            {'title_id': title_id, 'score': score, 'delta': -amount}
+            for (title_id, score), amount in buckets.items()))
+        post_bulk_soft_delete.send(sender=Review, removed=removed)
+    return removed, comment_ids
+
+
+def remove_comments(queryset):
+    """Помечает удалёнными комментарии выборки и сдвигает счётчики.
+
+    Возвращает словарь ``{id комментария: id отзыва}``.
+    """
+    with transaction.atomic():
+        rows = list(queryset.order_by().values_list(
+            'pk', 'review_id', 'review__title_id'))
+        if not rows:
+            return {}
+        removed = {pk: review_id for pk, review_id, _ in rows}
+        Comment.objects.filter(pk__in=removed).update(
+            deleted_at=timezone.now())
+        counts = Counter(removed.values())
+        Review.objects.shift_comment_counts(
+            {review_id: -amount for review_id, amount in counts.items()})
+        post_bulk_soft_delete.send(
+            sender=Comment, removed=removed,
+            title_ids={title_id for _, _, title_id in rows})
+    return removed
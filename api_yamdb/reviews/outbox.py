@@ -0,0 +1,135 @@
+import uuid
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from .models import OutboxEvent
+
+BATCH_SIZE = 100
+MAX_ATTEMPTS = 5
+RETRY_DELAY = timedelta(seconds=30)
+MAX_RETRY_DELAY = timedelta(hours=1)
+
+_handlers = {}
+
+
+def handler(event_type):
+    """Регистрирует обработчик пачки событий одного типа.
+
+    Обработчик получает список событий и возвращает словарь
+    ``{id события: текст ошибки}`` для событий, которые не удалось
+    обработать; остальные считаются доставленными. Исключение в
+    обработчике считается ошибкой для всей пачки.
+    """
+    def decorator(func):
+        _handlers[event_type] = func
+        return func
+    return decorator
+
+
+def enqueue(event_type, **payload):
+    """Записывает событие в текущей транзакции вызывающего кода."""
+    return OutboxEvent.objects.create(event_type=event_type, payload=payload)
+
+
+def enqueue_many(event_type, payloads):
+    """Записывает несколько событий одного типа одним запросом."""
+    return OutboxEvent.objects.bulk_create(
+        OutboxEvent(event_type=event_type, payload=payload)
+        for payload in payloads)
+
+
+def retry_at(attempts, now):
+    delay = min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+    return now + delay
+
+
+def claim_batch(batch_size=BATCH_SIZE, event_types=None):
+    """Забирает пачку готовых событий под уникальной меткой.
+
+    Метка ставится одним UPDATE, поэтому два параллельных обработчика
+    не получат одно и то же событие. Метка, оставшаяся от упавшего
+    процесса, снимается вместе с переносом ``available_at``, так что
+    событие будет выбрано повторно.
+    """
+    claim = uuid.uuid4().hex
+    now = timezone.now()
+    ready = OutboxEvent.objects.filter(failed=False, available_at__lte=now)
+    if event_types:
+        ready = ready.filter(event_type__in=event_types)
+    ids = ready.order_by('available_at', 'id').values('id')[:batch_size]
+    OutboxEvent.objects.filter(id__in=ids).update(
+        claim=claim, available_at=now + MAX_RETRY_DELAY)
+    return list(OutboxEvent.objects.filter(claim=claim).order_by('id'))
+
+
+def process_batch(batch_size=BATCH_SIZE, max_attempts=MAX_ATTEMPTS,
+                  event_types=None):
+    """Обрабатывает одну пачку событий и возвращает их количество.
+
+    События каждого типа обрабатываются в отдельной транзакции вместе
+    с удалением доставленных, поэтому изменения в базе применяются
+    ровно один раз. Внешние действия (письма) при сбое после отправки
+    могут повториться: доставка гарантируется не реже одного раза.
+    ``event_types`` ограничивает обработку событиями этих типов.
+    """
+    events = claim_batch(batch_size, event_types)
+    groups = {}
+    for event in events:
+        groups.setdefault(event.event_type, []).append(event)
+    for event_type, group in groups.items():
+        func = _handlers.get(event_type)
+        try:
+            with transaction.atomic():
+                if func is None:
+                    errors = {
+                        event.pk: f'Нет обработчика для {event_type}'
+                        for event in group}
+                else:
+                    errors = func(group) or {}
+                OutboxEvent.objects.filter(
+                    pk__in=[event.pk for event in group
+                            if event.pk not in errors]).delete()
+        except Exception as error:
+            errors = {event.pk: repr(error) for event in group}
+        if errors:
+            record_failures(
+                [event for event in group if event.pk in errors],
+                errors, max_attempts)
+    return len(events)
+
+
+def record_failures(events, errors, max_attempts):
+    now = timezone.now()
+    for event in events:
+        event.attempts += 1
+        event.last_error = errors[event.pk]
+        event.failed = event.attempts >= max_attempts
+        event.available_at = retry_at(event.attempts, now)
+        event.claim = ''
+    OutboxEvent.objects.bulk_update(
+        events, ['attempts', 'last_error', 'failed', 'available_at',
+                 'claim'])
+
+
+def requeue(queryset):
+    """Возвращает недоставленные события в очередь с новым счётом попыток."""
+    return queryset.update(failed=False, attempts=0, claim='',
+                           available_at=timezone.now())
+
+
+def stats():
+    """Глубина очереди, число недоставленных событий и задержка в секундах.
+
+    Задержка - возраст самого старого ожидающего события.
+    """
+    pending = OutboxEvent.objects.filter(failed=False)
+    oldest = pending.aggregate(oldest=Min('created_at'))['oldest']
+    return {
+        'depth': pending.count(),
+        'failed': OutboxEvent.objects.filter(failed=True).count(),
+        'lag_seconds': (
+            (timezone.now() - oldest).total_seconds() if oldest else 0.0),
+    }
@@ -0,0 +1,108 @@
+import re
+
+from django.db import connections
+from django.db.models import Q
+
+FTS_TABLE = 'reviews_title_fts'
+# Веса столбцов name и description для bm25: совпадение в названии
+# важнее совпадения в описании.
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+CREATE_TABLE_SQL = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, description,
+        content='reviews_title', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+"""
+
+TRIGGERS_SQL = {
+    f'{FTS_TABLE}_insert': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+        AFTER INSERT ON reviews_title
+        BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END
+    """,
+    f'{FTS_TABLE}_delete': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+        AFTER DELETE ON reviews_title
+        BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+        END
+    """,
+    f'{FTS_TABLE}_update': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+        AFTER UPDATE OF name, description ON reviews_title
+        BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO {FTS_TABLE}(rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END
+    """,
+}
+
+WORD_RE = re.compile(r'\w+')
+
+
+def install_title_search(connection):
+    """Создаёт FTS5-индекс произведений и триггеры синхронизации.
+
+    SQLite пересоздаёт таблицу reviews_title при многих изменениях схемы
+    и теряет её триггеры, поэтому функция идемпотентна и вызывается
+    после каждой миграции: недостающие триггеры создаются заново, а
+    индекс перестраивается.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_TABLE_SQL)
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+            "AND tbl_name = 'reviews_title'"
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [name for name in TRIGGERS_SQL if name not in existing]
+        for name in missing:
+            cursor.execute(TRIGGERS_SQL[name])
+        if missing:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def drop_title_search(connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name in TRIGGERS_SQL:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def build_match_query(text):
+    """Превращает пользовательский ввод в безопасный префиксный запрос."""
+    return ' '.join(f'"{word}"*' for word in WORD_RE.findall(text))
+
+
+def search_titles(queryset, text):
+    """Фильтрует произведения по названию и описанию с ранжированием."""
+    match = build_match_query(text)
+    if not match:
+        return queryset.none()
+    if connections[queryset.db].vendor != 'sqlite':
+        return queryset.filter(
+            Q(name__icontains=text) | Q(description__icontains=text))
+    # Таблица FTS присоединяется один раз: bm25 считается в той же
+    # выборке, что и MATCH, а не подзапросом на каждую строку.
+    table = queryset.model._meta.db_table
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = {table}.id', f'{FTS_TABLE} MATCH %s'],
+        params=[match],
+        select={'search_rank': f'bm25({FTS_TABLE}, %s, %s)'},
+        select_params=[NAME_WEIGHT, DESCRIPTION_WEIGHT],
+    ).order_by('search_rank', '-id')
@@ -0,0 +1,80 @@
+import threading
+from contextlib import contextmanager
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .handlers import COMMENT_CREATED, SCORE_SHIFTED
+from .models import Comment, Review, Title, post_soft_delete
+from .outbox import enqueue
+
+_state = threading.local()
+
+
+@contextmanager
+def signals_suspended():
+    """Отключает обработчики счётчиков для изменений набором.
+
+    Код внутри блока сам отвечает за счётчики и версии кэша.
+    """
+    _state.suspended = True
+    try:
+        yield
+    finally:
+        _state.suspended = False
+
+
+def is_suspended():
+    return getattr(_state, 'suspended', False)
+
+
+def is_counted(instance, signal):
+    # Строки, помеченные удалёнными, уже вычтены из счётчиков.
+    return signal is post_soft_delete or instance.deleted_at is None
+
+
+def add_score(title_id, score, sign):
+    # Рейтинг нужен в ответе сразу, гистограмма обновляется воркером.
+    Title.objects.apply_score(title_id, sign * score, sign)
+    enqueue(SCORE_SHIFTED, title_id=title_id, score=score, delta=sign)
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    if is_suspended():
+        return
+    loaded = getattr(instance, '_loaded_values', {})
+    old_title_id = loaded.get('title_id', instance.title_id)
+    old_score = loaded.get('score', instance.score)
+    if created:
+        add_score(instance.title_id, instance.score, 1)
+    elif (old_title_id, old_score) != (instance.title_id, instance.score):
+        add_score(old_title_id, old_score, -1)
+        add_score(instance.title_id, instance.score, 1)
+    instance._loaded_values = {
+        'title_id': instance.title_id, 'score': instance.score}
+
+
+@receiver(post_delete, sender=Review)
+@receiver(post_soft_delete, sender=Review)
+def update_rating_on_delete(sender, instance, signal, **kwargs):
+    if is_suspended() or not is_counted(instance, signal):
+        return
+    add_score(instance.title_id, instance.score, -1)
+
+
+@receiver(post_save, sender=Comment)
+def update_comment_count_on_save(sender, instance, created, **kwargs):
+    if is_suspended():
+        return
+    if created:
+        Review.objects.shift_comment_count(instance.review_id, 1)
+        enqueue(COMMENT_CREATED, comment_id=instance.pk)
+
+
+@receiver(post_delete, sender=Comment)
+@receiver(post_soft_delete, sender=Comment)
+def update_comment_count_on_delete(sender, instance, signal, **kwargs):
+    if is_suspended() or not is_counted(instance, signal):
+        return
+    Review.objects.shift_comment_count(instance.review_id, -1)
@@ -0,0 +1,19 @@
+from django.conf import settings
+
+
+def pragma_statements(pragmas):
+    return [f'PRAGMA {name} = {value}' for name, value in pragmas.items()]
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Применяет профиль ``SQLITE_PRAGMAS`` к новому соединению SQLite.
+
+    Вызывается по сигналу ``connection_created``; при ``CONN_MAX_AGE``
+    соединение живёт дольше запроса, и настройка выполняется редко.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for statement in pragma_statements(
+                getattr(settings, 'SQLITE_PRAGMAS', {})):
+            cursor.execute(statement)
@@ -418,11 +418,12 @@ class Test01UserAPI:
                                                django_user_model):
         users_cnt = django_user_model.objects.count()
         response = admin_client.delete(f'{self.USERS_URL}{user.username}/')
-        assert response.status_code == HTTPStatus.NO_CONTENT, (
+        assert response.status_code == HTTPStatus.ACCEPTED, (
             f'Проверьте, что DELETE-запрос администратора к `{self.USERS_URL}'
-            '{username}/` возвращает ответ со статусом 204.'
+            '{username}/` возвращает ответ со статусом 202.'
         )
-        assert django_user_model.objects.count() == (users_cnt - 1), (
+        assert django_user_model.objects.filter(is_active=True).count() == (
+                users_cnt - 1), (
             f'Проверьте, что DELETE-запрос администратора к `{self.USERS_URL}'
             '{username}/` удаляет пользователя.'
         )
@@ -461,12 +462,13 @@ class Test01UserAPI:
         response = user_superuser_client.delete(
             f'{self.USERS_URL}{user.username}/'
         )
-        assert response.status_code == HTTPStatus.NO_CONTENT, (
+        assert response.status_code == HTTPStatus.ACCEPTED, (
             'Проверьте, что DELETE-запрос суперпользователя к '
             f'`{self.USERS_URL}'
-            '{username}/` возвращает ответ со статусом 204.'
+            '{username}/` возвращает ответ со статусом 202.'
         )
-        assert django_user_model.objects.count() == (users_cnt - 1), (
+        assert django_user_model.objects.filter(is_active=True).count() == (
+                users_cnt - 1), (
             'Проверьте, что DELETE-запрос суперпользователя к '
             f'`{self.USERS_URL}'
             '{username}/` удаляет пользователя.'
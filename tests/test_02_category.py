@@ -103,10 +103,10 @@ class Test02CategoryAPI:
                 slug=category_1['slug']
             )
         )
-        assert response.status_code == HTTPStatus.NO_CONTENT, (
+        assert response.status_code == HTTPStatus.ACCEPTED, (
             'Проверьте, что DELETE-запрос администратора к '
             f'`{self.CATEGORY_SLUG_TEMPLATE_URL}` возвращает ответ со '
-            'статусом 204.'
+            'статусом 202.'
         )
         response = admin_client.get(self.CATEGORY_URL)
         test_data = response.json()['results']
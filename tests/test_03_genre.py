@@ -91,10 +91,10 @@ class Test03GenreAPI:
         response = admin_client.delete(
             self.GENRES_SLUG_TEMPLATE_URL.format(slug=genres[0]['slug'])
         )
-        assert response.status_code == HTTPStatus.NO_CONTENT, (
+        assert response.status_code == HTTPStatus.ACCEPTED, (
             'Проверьте, что DELETE-запрос администратора к '
             f'`{self.GENRES_SLUG_TEMPLATE_URL}` возвращает ответ со  статусом '
-            '204.'
+            '202.'
         )
         response = admin_client.get(self.GENRES_URL)
         test_data = response.json()['results']
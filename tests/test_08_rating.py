@@ -0,0 +1,145 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_title_row(self, title_id):
+        from reviews.models import Title
+        return Title.objects.values(
+            'score_sum', 'score_count', 'rating').get(pk=title_id)
+
+    def test_01_rating_follows_review_changes(self, admin_client, user_client,
+                                              moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+
+        create_single_review(admin_client, title_id, 'Отлично', 10)
+        response = create_single_review(user_client, title_id, 'Так себе', 4)
+        review_id = response.json()['id']
+        assert self.get_title_row(title_id) == {
+            'score_sum': 14, 'score_count': 2, 'rating': 7.0
+        }, (
+            'Проверьте, что при создании отзыва в произведении обновляются '
+            'сохранённые сумма оценок, их количество и рейтинг.'
+        )
+
+        response = user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review_id),
+            data={'score': 6}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_title_row(title_id)['rating'] == 8.0, (
+            'Проверьте, что при изменении оценки в отзыве рейтинг '
+            'произведения пересчитывается.'
+        )
+
+        response = user_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review_id)
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_title_row(title_id) == {
+            'score_sum': 10, 'score_count': 1, 'rating': 10.0
+        }, (
+            'Проверьте, что при удалении отзыва рейтинг произведения '
+            'пересчитывается.'
+        )
+        response = admin_client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id))
+        assert response.json().get('rating') == 10
+
+    def test_02_rating_reset_without_reviews(self, admin_client, admin):
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[1]['id']
+        create_single_review(admin_client, title_id, 'Неплохо', 7)
+        Review.objects.filter(title_id=title_id).get().delete()
+        assert self.get_title_row(title_id) == {
+            'score_sum': 0, 'score_count': 0, 'rating': None
+        }, (
+            'Проверьте, что после удаления последнего отзыва рейтинг '
+            'произведения становится `None`.'
+        )
+
+    def test_03_stale_review_edits(self, admin_client):
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review_id = create_single_review(
+            admin_client, title_id, 'Отлично', 9).json()['id']
+        # Два запроса загрузили отзыв до того, как любой из них записал.
+        first, second = (Review.objects.get(pk=review_id) for _ in range(2))
+        first.score = 3
+        first.save()
+        second.score = 5
+        second.save()
+        assert self.get_title_row(title_id) == {
+            'score_sum': 5, 'score_count': 1, 'rating': 5.0
+        }, (
+            'Проверьте, что параллельные правки отзыва не сдвигают рейтинг '
+            'на основе устаревшей оценки.'
+        )
+        stale = Review.objects.get(pk=review_id)
+        Review.objects.get(pk=review_id).delete()
+        stale.delete()
+        assert self.get_title_row(title_id) == {
+            'score_sum': 0, 'score_count': 0, 'rating': None
+        }
+
+    def test_04_titles_ordered_by_rating(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(admin_client, titles[0]['id'], 'Слабо', 2)
+        create_single_review(admin_client, titles[1]['id'], 'Сильно', 9)
+
+        response = client.get('/api/v1/titles/')
+        names = [title['name'] for title in response.json()['results']]
+        assert names == [titles[1]['name'], titles[0]['name']], (
+            'Проверьте, что список произведений отсортирован по убыванию '
+            'рейтинга.'
+        )
+
+    def test_05_score_histogram(self, admin_client, user_client,
+                                moderator_client, client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/scores/'
+        create_single_review(admin_client, title_id, 'Отлично', 10)
+        create_single_review(moderator_client, title_id, 'Отлично', 10)
+        response = create_single_review(user_client, title_id, 'Слабо', 3)
+        user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=response.json()['id']),
+            data={'score': 4}
+        )
+        call_command('process_outbox', '--once', stdout=StringIO())
+
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        histogram = {item['score']: item['count'] for item in response.json()}
+        assert histogram == {
+            1: 0, 2: 0, 3: 0, 4: 1, 5: 0, 6: 0, 7: 0, 8: 0, 9: 0, 10: 2
+        }, (
+            f'Проверьте, что `{url}` возвращает число отзывов для каждой '
+            'оценки и учитывает изменение оценки.'
+        )
+
+        response = client.get('/api/v1/titles/999/scores/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,109 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import (create_single_comment, create_single_review,
+                         create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryBudget:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+    TITLE_LIST_MAX_QUERIES = 3
+    TITLE_DETAIL_MAX_QUERIES = 2
+    REVIEW_LIST_MAX_QUERIES = 3
+    REVIEW_DETAIL_MAX_QUERIES = 2
+    COMMENT_LIST_MAX_QUERIES = 3
+
+    def create_many_titles(self, admin_client, amount):
+        from reviews.models import Category, Genre, Title
+
+        titles, _, _ = create_titles(admin_client)
+        genres = list(Genre.objects.all())
+        category = Category.objects.first()
+        for idx in range(amount):
+            title = Title.objects.create(
+                name=f'Произведение {idx}', year=2000, category=category)
+            title.genre.set(genres)
+        return titles
+
+    def test_01_title_list_query_budget(self, admin_client, client,
+                                        django_assert_max_num_queries):
+        self.create_many_titles(admin_client, 30)
+
+        with django_assert_max_num_queries(self.TITLE_LIST_MAX_QUERIES):
+            response = client.get(self.TITLES_URL)
+        assert len(response.json()['results']) == 32, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` возвращает все '
+            'произведения.'
+        )
+
+    def test_02_title_detail_query_budget(self, admin_client, client,
+                                          django_assert_max_num_queries):
+        titles = self.create_many_titles(admin_client, 1)
+        create_single_review(admin_client, titles[0]['id'], 'Хорошо', 8)
+
+        with django_assert_max_num_queries(self.TITLE_DETAIL_MAX_QUERIES):
+            response = client.get(self.TITLES_DETAIL_URL_TEMPLATE.format(
+                title_id=titles[0]['id']))
+        assert response.json()['rating'] == 8
+
+    def create_authors(self, django_user_model, amount):
+        from rest_framework.test import APIClient
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        clients = []
+        for idx in range(amount):
+            author = django_user_model.objects.create_user(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake')
+            api_client = APIClient()
+            api_client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(author)}')
+            clients.append(api_client)
+        return clients
+
+    def test_03_review_and_comment_query_budget(
+            self, admin_client, client, django_user_model,
+            django_assert_max_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        authors = self.create_authors(django_user_model, 10)
+        review_ids = [
+            create_single_review(
+                author, title_id, f'Отзыв {idx}', 5).json()['id']
+            for idx, author in enumerate(authors)
+        ]
+        for idx, author in enumerate(authors):
+            create_single_comment(
+                author, title_id, review_ids[0], f'Комментарий {idx}')
+
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        with django_assert_max_num_queries(self.REVIEW_LIST_MAX_QUERIES):
+            response = client.get(reviews_url, {'count': 'exact'})
+        authors = {review['author'] for review in response.json()['results']}
+        assert authors == {f'author{idx}' for idx in range(10)}
+        with django_assert_max_num_queries(self.REVIEW_DETAIL_MAX_QUERIES):
+            client.get(f'{reviews_url}{review_ids[0]}/')
+
+        comments_url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review_ids[0])
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get(comments_url, {'count': 'exact'})
+        assert len(response.json()['results']) == 10
+        assert len(captured) <= self.COMMENT_LIST_MAX_QUERIES, (
+            f'Проверьте, что GET-запрос к `{self.COMMENTS_URL_TEMPLATE}` '
+            'получает авторов комментариев тем же запросом.'
+        )
+        author_query = next(
+            query['sql'] for query in captured
+            if 'reviews_comment' in query['sql'] and 'JOIN' in query['sql'])
+        assert '"reviews_user"."password"' not in author_query, (
+            'Проверьте, что из таблицы пользователей выбираются только '
+            'нужные поля.'
+        )
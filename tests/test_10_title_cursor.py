@@ -0,0 +1,77 @@
+import base64
+import json
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10TitleCursorPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def create_rated_titles(self, admin_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(admin_client, titles[0]['id'], 'Хорошо', 8)
+        create_single_review(admin_client, titles[1]['id'], 'Хорошо', 8)
+        for idx in range(5):
+            Title.objects.create(name=f'Без отзывов {idx}', year=2001)
+        return list(
+            Title.objects.order_by('-rating', '-id').values_list(
+                'id', flat=True)
+        )
+
+    def test_01_cursor_walks_all_titles(self, admin_client, client):
+        expected_ids = self.create_rated_titles(admin_client)
+
+        url = f'{self.TITLES_URL}?cursor=&limit=3'
+        seen_ids = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert 'count' not in data
+            seen_ids.extend(title['id'] for title in data['results'])
+            url = data['next']
+        assert seen_ids == expected_ids, (
+            f'Проверьте, что курсорная пагинация `{self.TITLES_URL}` '
+            'возвращает все произведения по одному разу в порядке '
+            'убывания рейтинга.'
+        )
+
+    def test_02_limit_offset_still_supported(self, admin_client, client):
+        expected_ids = self.create_rated_titles(admin_client)
+
+        response = client.get(f'{self.TITLES_URL}?limit=2&offset=2')
+        data = response.json()
+        assert data['count'] == len(expected_ids)
+        assert [title['id'] for title in data['results']] == (
+            expected_ids[2:4]
+        )
+
+    def test_03_invalid_cursor(self, client):
+        response = client.get(f'{self.TITLES_URL}?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_04_forged_cursor(self, admin_client, client):
+        self.create_rated_titles(admin_client)
+        for url, position in (
+            (self.TITLES_URL, ['abc', 1]),
+            (self.TITLES_URL, [1.0, 'x']),
+            (self.TITLES_URL, [{'a': 1}, 1]),
+            ('/api/v1/reviews/latest/', ['abc', 1]),
+            ('/api/v1/reviews/latest/', [1.0, 'x']),
+            ('/api/v1/reviews/latest/', [{'a': 1}, 1]),
+        ):
+            cursor = base64.urlsafe_b64encode(
+                json.dumps(position).encode()).decode()
+            response = client.get(url, {'cursor': cursor})
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что `{url}` отклоняет курсор {position} с '
+                'неверными типами значений ответом со статусом 404.'
+            )
+            assert response.json()['detail'] == 'Неверный курсор.'
@@ -0,0 +1,83 @@
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def create_catalogue(self):
+        from reviews.models import Title
+
+        shawshank = Title.objects.create(
+            name='Побег из Шоушенка', year=1994,
+            description='Тюремная драма')
+        Title.objects.create(
+            name='Зелёная миля', year=1999,
+            description='Ещё одна тюрьма и ещё один побег')
+        Title.objects.create(name='Терминатор', year=1984)
+        return shawshank
+
+    def test_01_search_is_case_insensitive(self, client):
+        shawshank = self.create_catalogue()
+
+        response = client.get(self.TITLES_URL, {'search': 'побег'})
+        results = response.json()['results']
+        assert [title['name'] for title in results][:1] == [shawshank.name], (
+            'Проверьте, что поиск `search=` по произведениям не зависит от '
+            'регистра кириллицы и выше ранжирует совпадения в названии.'
+        )
+        assert response.json()['count'] == 2
+
+    def test_02_search_follows_title_changes(self, client):
+        from reviews.models import Title
+
+        shawshank = self.create_catalogue()
+        Title.objects.filter(pk=shawshank.pk).update(name='Рита Хейворт')
+        response = client.get(self.TITLES_URL, {'search': 'хейворт'})
+        assert [title['id'] for title in response.json()['results']] == [
+            shawshank.pk
+        ]
+
+        Title.objects.filter(pk=shawshank.pk).delete()
+        response = client.get(self.TITLES_URL, {'search': 'хейворт'})
+        assert response.json()['count'] == 0
+
+    def test_03_search_ignores_query_syntax(self, client):
+        self.create_catalogue()
+        response = client.get(self.TITLES_URL, {'search': '"мил* ('})
+        assert response.status_code == 200
+        assert response.json()['count'] == 1
+
+    def test_04_name_outweighs_description(self, client):
+        from reviews.models import Title
+
+        heat = Title.objects.create(
+            name='Схватка: ограбление в большом городе', year=1995)
+        Title.objects.create(
+            name='Ронин', year=1998,
+            description='Ограбление, погоня, ограбление.')
+        response = client.get(self.TITLES_URL, {'search': 'ограбление'})
+        results = response.json()['results']
+        assert [title['id'] for title in results][:1] == [heat.pk], (
+            'Проверьте, что совпадение в названии весит больше, чем '
+            'совпадения в описании.'
+        )
+
+    def test_05_rank_computed_in_join(self):
+        from django.db import connection
+
+        from api.views import TitleViewSet
+        from reviews.search import search_titles
+
+        if connection.vendor != 'sqlite':
+            pytest.skip('Полнотекстовый индекс есть только в SQLite.')
+        queryset = search_titles(TitleViewSet.queryset.all(), 'ограбление')
+        sql, params = queryset[:10].query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' | '.join(row[-1] for row in cursor.fetchall())
+        assert 'SUBQUERY' not in plan and sql.count('MATCH') == 1, (
+            'Проверьте, что ранг поиска считается в одном соединении с '
+            f'полнотекстовым индексом, а не для каждой строки. План: {plan}'
+        )
@@ -0,0 +1,45 @@
+import pytest
+
+from tests.utils import create_categories, create_genre
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12CatalogueSnapshot:
+
+    CATEGORY_URL = '/api/v1/categories/'
+    GENRES_URL = '/api/v1/genres/'
+
+    def test_01_lists_served_without_queries(self, admin_client, client,
+                                             django_assert_num_queries):
+        categories = create_categories(admin_client)
+        genres = create_genre(admin_client)
+        client.get(self.CATEGORY_URL)
+        client.get(self.GENRES_URL)
+
+        with django_assert_num_queries(0):
+            response = client.get(self.CATEGORY_URL)
+            assert response.json()['count'] == len(categories)
+            response = client.get(self.GENRES_URL, {'search': 'ужасы'})
+            assert response.json()['results'] == [genres[0]], (
+                f'Проверьте, что `{self.GENRES_URL}?search=<name>` ищет '
+                'жанр по точному имени без учёта регистра.'
+            )
+
+    def test_02_snapshot_invalidated_on_change(self, admin_client, client):
+        categories = create_categories(admin_client)
+        client.get(self.CATEGORY_URL)
+
+        new_category = {'name': 'Музыка', 'slug': 'music'}
+        admin_client.post(self.CATEGORY_URL, data=new_category)
+        response = client.get(self.CATEGORY_URL)
+        assert new_category in response.json()['results'], (
+            f'Проверьте, что после создания категории `{self.CATEGORY_URL}` '
+            'возвращает её в списке.'
+        )
+
+        admin_client.delete(f'{self.CATEGORY_URL}{categories[0]["slug"]}/')
+        response = client.get(self.CATEGORY_URL)
+        assert categories[0] not in response.json()['results'], (
+            f'Проверьте, что после удаления категории `{self.CATEGORY_URL}` '
+            'не возвращает её в списке.'
+        )
@@ -0,0 +1,198 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import (create_comments, create_single_comment,
+                         create_single_review)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ConditionalGet:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def assert_not_modified(self, client, url, django_assert_num_queries,
+                            num_queries=1):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        etag = response.headers.get('ETag')
+        assert etag, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовок `ETag`.'
+        )
+        assert response.headers.get('Last-Modified')
+
+        # Запрос допускается только на проверку родительского объекта.
+        with django_assert_num_queries(num_queries):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            '`If-None-Match` возвращает ответ со статусом 304 без '
+            'выборки и сериализации данных.'
+        )
+        return etag
+
+    def test_01_conditional_get(self, client, admin_client, admin,
+                                user_client, user,
+                                django_assert_num_queries):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client})
+        title_id = titles[0]['id']
+        urls = (
+            self.TITLES_URL,
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id),
+            self.COMMENTS_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']),
+        )
+        etags = [
+            self.assert_not_modified(
+                client, url, django_assert_num_queries,
+                num_queries=int(url != self.TITLES_URL))
+            for url in urls
+        ]
+
+        create_single_review(user_client, title_id, 'Новый отзыв', 3)
+        for url, etag in zip(urls[:2], etags):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что после добавления отзыва `{url}` '
+                'возвращает новые данные, а не ответ со статусом 304.'
+            )
+        response = client.get(urls[2], HTTP_IF_NONE_MATCH=etags[2])
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_02_if_modified_since(self, client, admin_client,
+                                  django_assert_num_queries):
+        admin_client.post('/api/v1/categories/',
+                          data={'name': 'Фильм', 'slug': 'films'})
+        response = client.get(self.TITLES_URL)
+        last_modified = response.headers['Last-Modified']
+
+        with django_assert_num_queries(0):
+            response = client.get(
+                self.TITLES_URL, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_03_comment_changes_review_list(self, client, admin_client,
+                                            admin, user_client,
+                                            django_assert_num_queries):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client})
+        title_id = titles[0]['id']
+        review_id = reviews[0]['id']
+        urls = (
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id),
+            f'{self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)}'
+            f'{review_id}/',
+        )
+        # Для отзыва проверяются произведение и сам отзыв.
+        etags = [
+            self.assert_not_modified(
+                client, url, django_assert_num_queries, num_queries)
+            for url, num_queries in zip(urls, (1, 2))
+        ]
+
+        comment_id = create_single_comment(
+            user_client, title_id, review_id, 'Ещё комментарий').json()['id']
+        for url, etag in zip(urls, etags):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что после добавления комментария `{url}` '
+                'возвращает новый `comment_count`, а не ответ со статусом '
+                '304.'
+            )
+        etags = [client.get(url).headers['ETag'] for url in urls]
+
+        response = admin_client.post(
+            '/api/v1/moderation/comments/', data={'ids': [comment_id]},
+            format='json')
+        assert response.status_code == HTTPStatus.OK
+        for url, etag in zip(urls, etags):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что после удаления комментариев `{url}` '
+                'возвращает новые данные.'
+            )
+
+    def test_04_missing_object_not_modified(self, client, admin_client,
+                                            admin):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client})
+        title_id = titles[0]['id']
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        for url in (
+            f'{reviews_url}{reviews[0]["id"] + 100}/',
+            self.COMMENTS_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id'] + 100),
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id + 100),
+        ):
+            response = client.get(url, HTTP_IF_NONE_MATCH='*')
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что GET-запрос к `{url}` несуществующего '
+                'объекта возвращает ответ со статусом 404, а не 304.'
+            )
+
+    def test_05_versions_survive_cull(self, client, admin_client, admin,
+                                      settings, django_assert_num_queries):
+        from django.core.cache import cache
+
+        create_comments(admin_client, {admin: admin_client})
+        assert settings.CACHES['default']['OPTIONS']['MAX_ENTRIES'] > 300, (
+            'Проверьте, что размер кэша рассчитан на число его ключей.'
+        )
+        etag = client.get(self.TITLES_URL).headers['ETag']
+        # Очистка и вытеснение общего кэша не затрагивают версии.
+        cache.clear()
+        with django_assert_num_queries(0):
+            response = client.get(self.TITLES_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что версии коллекций хранятся отдельно от '
+            'вытесняемых записей кэша.'
+        )
+
+    def test_06_version_store(self, settings, django_assert_num_queries):
+        from pathlib import Path
+
+        from api.versions import bump_version, get_version, version_key
+
+        def cache_files():
+            return set(Path(settings.CACHES['default']['LOCATION']).glob(
+                '*.djcache'))
+
+        key = version_key('test', 'store')
+        files = cache_files()
+        with django_assert_num_queries(0):
+            before = get_version(key)
+            assert get_version(key) == before
+            bump_version(key)
+            after = get_version(key)
+        assert after != before and after[1] >= before[1], (
+            'Проверьте, что смена версии сохраняется в хранилище версий.'
+        )
+        assert cache_files() == files, (
+            'Проверьте, что версии не записываются в вытесняемый файловый '
+            'кэш.'
+        )
+
+    def test_07_detail_checked_before_queryset(self, client, admin_client,
+                                               admin,
+                                               django_assert_num_queries):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        _, _, titles = create_comments(admin_client, {admin: admin_client})
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        etag = client.get(url).headers['ETag']
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert len(context.captured_queries) == 1 and (
+            'genre' not in context.captured_queries[0]['sql']), (
+            f'Проверьте, что ответ 304 для `{url}` проверяет объект одним '
+            'облегчённым запросом, без связанных объектов. Запросы: '
+            f'{[query["sql"] for query in context.captured_queries]}'
+        )
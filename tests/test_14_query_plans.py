@@ -0,0 +1,132 @@
+import pytest
+from django.db import connection
+
+
+@pytest.mark.django_db
+class Test14QueryPlans:
+
+    def explain(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return ' | '.join(row[-1] for row in cursor.fetchall())
+
+    def assert_uses_index(self, queryset, index_name, description,
+                          sorted_by_index=True):
+        if connection.vendor != 'sqlite':
+            pytest.skip('План запроса проверяется только для SQLite.')
+        plan = self.explain(queryset)
+        assert index_name in plan, (
+            f'Проверьте, что {description} использует индекс '
+            f'`{index_name}`. План: {plan}'
+        )
+        assert 'SCAN' not in plan, (
+            f'Проверьте, что {description} не просматривает таблицу '
+            f'целиком. План: {plan}'
+        )
+        assert not sorted_by_index or 'TEMP B-TREE' not in plan, (
+            f'Проверьте, что {description} не сортирует строки во '
+            f'временном B-дереве. План: {plan}'
+        )
+
+    def build_view(self, viewset_class, kwargs=None, params=None):
+        """Готовит представление списка так же, как его вызывает роутер."""
+        from rest_framework.test import APIRequestFactory
+
+        view = viewset_class(action_map={'get': 'list'}, args=(),
+                             kwargs=kwargs or {}, format_kwarg=None)
+        view.request = view.initialize_request(
+            APIRequestFactory().get('/', params or {}))
+        return view
+
+    def view_queryset(self, view):
+        return view.filter_queryset(view.get_queryset())
+
+    def test_01_review_list_uses_index(self, admin):
+        from api.views import ReviewViewSet
+        from reviews.models import Title
+
+        title = Title.objects.create(name='Произведение', year=2000)
+        view = self.build_view(ReviewViewSet, {'title_id': title.pk})
+        self.assert_uses_index(
+            self.view_queryset(view)[:10],
+            'review_title_pub_date_idx',
+            'список отзывов произведения'
+        )
+
+    def test_02_comment_list_uses_index(self, admin):
+        from api.views import CommentViewSet
+        from reviews.models import Review, Title
+
+        title = Title.objects.create(name='Произведение', year=2000)
+        review = Review.objects.create(
+            title=title, author=admin, text='Отзыв', score=5)
+        view = self.build_view(
+            CommentViewSet, {'title_id': title.pk, 'review_id': review.pk})
+        self.assert_uses_index(
+            self.view_queryset(view)[:10],
+            'comment_review_pub_date_idx',
+            'список комментариев к отзыву'
+        )
+
+    def test_03_category_filter_uses_index(self):
+        from api.views import TitleViewSet
+
+        for params in ({'category': 'movie'},
+                       {'category': 'movie', 'year': 1999}):
+            view = self.build_view(TitleViewSet, params=params)
+            queryset = self.view_queryset(view)
+            pagination = view.paginator
+            pagination.model = queryset.model
+            for page in (
+                queryset[:10],
+                queryset.filter(pagination.get_seek_filter([5.0, 3])).order_by(
+                    *pagination.ordering)[:10],
+            ):
+                self.assert_uses_index(
+                    page,
+                    'title_category_rating_idx',
+                    f'список произведений с фильтром {params}'
+                )
+
+    def test_04_genre_filter_uses_index(self):
+        from api.views import TitleViewSet
+
+        view = self.build_view(TitleViewSet, params={'genre': 'drama'})
+        # Рейтинг хранится в произведении, поэтому найденные через
+        # связующую таблицу произведения жанра сортируются отдельно.
+        self.assert_uses_index(
+            self.view_queryset(view)[:10],
+            'sqlite_autoindex_reviews_genretitle',
+            'список произведений с фильтром по жанру',
+            sorted_by_index=False
+        )
+
+    def test_05_keyset_pages_seek_index(self):
+        from django.utils import timezone
+
+        from api.pagination import PubDatePagination, TitlePagination
+        from reviews.models import Comment, Review, Title
+
+        now = timezone.now().isoformat()
+        for pagination_class, queryset, position, index_name in (
+            (PubDatePagination, Review.objects.all(),
+             [now, 10], 'review_pub_date_idx'),
+            (PubDatePagination, Review.objects.filter(author_id=1),
+             [now, 10], 'review_author_pub_date_idx'),
+            (PubDatePagination, Comment.objects.filter(author_id=1),
+             [now, 10], 'comment_author_pub_date_idx'),
+            (TitlePagination, Title.objects.all(), [5.0, 3],
+             'title_rating_idx'),
+            (TitlePagination, Title.objects.all(), [None, 3],
+             'title_rating_idx'),
+        ):
+            pagination = pagination_class()
+            pagination.model = queryset.model
+            self.assert_uses_index(
+                queryset.filter(
+                    pagination.get_seek_filter(position)
+                ).order_by(*pagination.ordering)[:10],
+                index_name,
+                f'курсорная страница `{pagination_class.__name__}`'
+            )
@@ -0,0 +1,69 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+
+from tests.utils import create_categories, create_genre
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15TitleBulkCreate:
+
+    BULK_URL = '/api/v1/titles/bulk/'
+
+    def test_01_bulk_create(self, admin_client,
+                            django_assert_max_num_queries):
+        from reviews.models import GenreTitle, Title
+
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        data = [
+            {
+                'name': f'Фильм {idx}',
+                'year': 2000 + idx,
+                'genre': [genres[0]['slug'], genres[1]['slug']],
+                'category': categories[0]['slug'],
+            }
+            for idx in range(20)
+        ]
+        data.append({
+            'name': 'Неизвестный жанр', 'year': 2001,
+            'genre': ['unknown'], 'category': categories[0]['slug']
+        })
+        data.append({
+            'name': 'Из будущего', 'year': 3000,
+            'genre': [], 'category': categories[1]['slug']
+        })
+
+        with django_assert_max_num_queries(8):
+            response = admin_client.post(
+                self.BULK_URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос администратора к `{self.BULK_URL}` '
+            'создаёт корректные произведения пакета и возвращает ответ со '
+            'статусом 201.'
+        )
+        result = response.json()
+        assert [item['index'] for item in result['created']] == list(
+            range(20))
+        assert [error['index'] for error in result['errors']] == [20, 21], (
+            f'Проверьте, что `{self.BULK_URL}` сообщает об ошибках каждого '
+            'некорректного произведения, не отклоняя весь пакет.'
+        )
+        assert 'genre' in result['errors'][0]['errors']
+        assert 'year' in result['errors'][1]['errors']
+        assert Title.objects.count() == 20
+        assert GenreTitle.objects.count() == 40
+
+    def test_02_bulk_create_permissions(self, user_client, moderator_client):
+        data = [{'name': 'Фильм', 'year': 2000, 'genre': [],
+                 'category': 'films'}]
+        response = APIClient().post(self.BULK_URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        for api_client in (user_client, moderator_client):
+            response = api_client.post(self.BULK_URL, data=data,
+                                       format='json')
+            assert response.status_code == HTTPStatus.FORBIDDEN, (
+                f'Проверьте, что `{self.BULK_URL}` доступен только '
+                'администратору.'
+            )
@@ -0,0 +1,57 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16PaginationCounts:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def count_queries(self, captured):
+        return [
+            query['sql'] for query in captured
+            if query['sql'].startswith('SELECT COUNT(*)')
+        ]
+
+    def test_01_review_count_from_counter(self, admin_client, admin,
+                                          client):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get(url)
+        assert response.json()['count'] == len(reviews)
+        assert not self.count_queries(captured), (
+            f'Проверьте, что `{url}` берёт число отзывов из счётчика '
+            'произведения, а не выполняет COUNT(*).'
+        )
+
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get(url, {'count': 'exact'})
+        assert response.json()['count'] == len(reviews)
+        assert self.count_queries(captured), (
+            f'Проверьте, что `{url}?count=exact` выполняет точный подсчёт.'
+        )
+
+    def test_02_title_count_cached_until_change(self, admin_client, admin,
+                                                client):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        client.get(self.TITLES_URL)
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get(self.TITLES_URL)
+        assert response.json()['count'] == len(titles)
+        assert not self.count_queries(captured), (
+            f'Проверьте, что повторный запрос к `{self.TITLES_URL}` берёт '
+            'число произведений из кэша.'
+        )
+
+        admin_client.delete(f'{self.TITLES_URL}{titles[0]["id"]}/')
+        response = client.get(self.TITLES_URL)
+        assert response.json()['count'] == len(titles) - 1, (
+            'Проверьте, что закэшированное число произведений сбрасывается '
+            'после изменения списка.'
+        )
@@ -0,0 +1,48 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17NestedRoutes:
+
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def test_01_comment_chain_must_match(self, admin_client, admin,
+                                         user_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client})
+        other_review = create_single_review(
+            user_client, titles[1]['id'], 'Другое произведение', 6).json()
+
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[1]['id'], review_id=reviews[0]['id'])
+        response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что запрос к комментариям отзыва, который '
+            'относится к другому произведению, возвращает ответ со '
+            'статусом 404.'
+        )
+        response = admin_client.post(url, data={'text': 'Мимо'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[1]['id'], review_id=other_review['id'])
+        response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+
+    def test_02_parents_resolved_once(self, admin_client, admin, client,
+                                      django_assert_max_num_queries):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client})
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id'])
+
+        # Родители одним запросом, число комментариев и сами комментарии.
+        with django_assert_max_num_queries(3):
+            response = client.get(url, {'count': 'exact'})
+        assert response.status_code == HTTPStatus.OK
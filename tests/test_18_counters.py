@@ -0,0 +1,83 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Counters:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def test_01_counters_in_api(self, admin_client, admin, user_client, user,
+                                client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client})
+        title_url = self.TITLE_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id'])
+        review_url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id'])
+
+        assert client.get(title_url).json().get('review_count') == 2, (
+            f'Проверьте, что ответ на GET-запрос к `{title_url}` содержит '
+            'число отзывов в поле `review_count`.'
+        )
+        assert client.get(review_url).json().get('comment_count') == 2, (
+            f'Проверьте, что ответ на GET-запрос к `{review_url}` содержит '
+            'число комментариев в поле `comment_count`.'
+        )
+
+        user.delete()
+        assert client.get(title_url).json()['review_count'] == 1, (
+            'Проверьте, что счётчик отзывов уменьшается при каскадном '
+            'удалении отзывов пользователя.'
+        )
+        assert client.get(review_url).json()['comment_count'] == 1, (
+            'Проверьте, что счётчик комментариев уменьшается при каскадном '
+            'удалении комментариев пользователя.'
+        )
+
+    def test_02_repair_counters(self, admin_client, admin):
+        from reviews.handlers import CONFIRMATION_REQUESTED, SCORE_SHIFTED
+        from reviews.models import OutboxEvent, Review, ScoreCount, Title
+        from reviews.outbox import enqueue
+
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client})
+        Title.objects.filter(pk=titles[0]['id']).update(
+            score_sum=100, score_count=7, rating=None)
+        ScoreCount.objects.filter(title_id=titles[0]['id']).delete()
+        Review.objects.filter(pk=reviews[0]['id']).update(comment_count=9)
+
+        enqueue(CONFIRMATION_REQUESTED, user_id=admin.pk)
+        events = OutboxEvent.objects.count()
+
+        out = StringIO()
+        call_command('repair_counters', '--dry-run', batch_size=1,
+                     stdout=out, stderr=StringIO())
+        assert 'произведения - 1, отзывы - 1' in out.getvalue()
+        assert Title.objects.get(pk=titles[0]['id']).score_count == 7
+        assert OutboxEvent.objects.count() == events, (
+            'Проверьте, что `repair_counters --dry-run` не обрабатывает '
+            'очередь событий.'
+        )
+
+        call_command('repair_counters', batch_size=1,
+                     stdout=StringIO(), stderr=StringIO())
+        event_types = set(OutboxEvent.objects.values_list(
+            'event_type', flat=True))
+        assert CONFIRMATION_REQUESTED in event_types and (
+            SCORE_SHIFTED not in event_types), (
+            'Проверьте, что `repair_counters` дочитывает из очереди только '
+            'события оценок.'
+        )
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.score_count, title.rating) == (
+            5, 1, 5.0)
+        assert ScoreCount.objects.histogram(title.pk)[5] == 1
+        assert Review.objects.get(pk=reviews[0]['id']).comment_count == 1
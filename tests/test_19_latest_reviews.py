@@ -0,0 +1,51 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19LatestReviews:
+
+    LATEST_URL = '/api/v1/reviews/latest/'
+
+    def test_01_latest_reviews_feed(self, admin_client, user_client,
+                                    moderator_client, client,
+                                    django_assert_max_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        created = []
+        for api_client in (admin_client, user_client, moderator_client):
+            for title in titles:
+                response = create_single_review(
+                    api_client, title['id'], 'Отзыв', 7)
+                created.append((response.json()['id'], title))
+
+        url = f'{self.LATEST_URL}?limit=4'
+        seen = []
+        while url:
+            with django_assert_max_num_queries(1):
+                response = client.get(url)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что GET-запрос к `{self.LATEST_URL}` '
+                'возвращает ответ со статусом 200.'
+            )
+            data = response.json()
+            seen.extend(data['results'])
+            url = data['next']
+
+        assert [review['id'] for review in seen] == [
+            review_id for review_id, _ in reversed(created)
+        ], (
+            f'Проверьте, что `{self.LATEST_URL}` возвращает отзывы всех '
+            'произведений от новых к старым без повторов и пропусков.'
+        )
+        titles_by_review = dict(created)
+        for review in seen:
+            title = titles_by_review[review['id']]
+            assert review['title'] == {
+                'id': title['id'], 'name': title['name']
+            }, (
+                f'Проверьте, что элементы `{self.LATEST_URL}` содержат '
+                'идентификатор и название произведения.'
+            )
@@ -0,0 +1,132 @@
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+from tests.utils import (create_single_comment, create_single_review,
+                         create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20Outbox:
+
+    @pytest.fixture(autouse=True)
+    def locmem_email(self, settings):
+        settings.EMAIL_BACKEND = (
+            'django.core.mail.backends.locmem.EmailBackend')
+
+    def process_outbox(self, *args):
+        out = StringIO()
+        call_command('process_outbox', '--once', *args, stdout=out)
+        return out.getvalue()
+
+    def test_01_events_written_with_changes(self, admin_client, user_client,
+                                            admin):
+        from reviews.models import OutboxEvent, ScoreCount
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review_id = create_single_review(
+            admin_client, title_id, 'Отлично', 9).json()['id']
+        create_single_comment(user_client, title_id, review_id, 'Согласен')
+        assert OutboxEvent.objects.count() == 2, (
+            'Проверьте, что создание отзыва и комментария записывает события '
+            'в очередь.'
+        )
+        assert ScoreCount.objects.histogram(title_id)[9] == 0
+        assert not mail.outbox
+
+        output = self.process_outbox()
+        assert 'Обработано событий: 2' in output
+        assert not OutboxEvent.objects.exists(), (
+            'Проверьте, что обработанные события удаляются из очереди.'
+        )
+        assert ScoreCount.objects.histogram(title_id)[9] == 1
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что автор отзыва получает письмо о новом комментарии.'
+        )
+        assert mail.outbox[0].to == [admin.email]
+
+    def test_02_failed_events_are_retried(self, admin_client, monkeypatch):
+        from reviews import outbox
+        from reviews.models import OutboxEvent, ScoreCount
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'Отлично', 9)
+
+        def broken_shift(*args, **kwargs):
+            raise RuntimeError('сбой')
+
+        with monkeypatch.context() as patch:
+            patch.setattr(ScoreCount.objects, 'shift', broken_shift)
+            self.process_outbox()
+        event = OutboxEvent.objects.get()
+        assert (event.attempts, event.failed) == (1, False), (
+            'Проверьте, что событие с ошибкой остаётся в очереди и '
+            'откладывается для повторной попытки.'
+        )
+        assert 'сбой' in event.last_error
+        assert outbox.stats()['depth'] == 1
+
+        OutboxEvent.objects.update(available_at=event.created_at)
+        self.process_outbox()
+        assert not OutboxEvent.objects.exists()
+        assert ScoreCount.objects.histogram(title_id)[9] == 1
+
+    def test_03_notifications_sent_one_by_one(self, admin_client, admin,
+                                              user_client, monkeypatch):
+        from django.core.mail.backends.locmem import EmailBackend
+
+        from reviews.models import OutboxEvent
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review_id = create_single_review(
+            admin_client, title_id, 'Отлично', 9).json()['id']
+        for text in ('Первый', 'Второй', 'Третий'):
+            create_single_comment(user_client, title_id, review_id, text)
+        send_messages = EmailBackend.send_messages
+
+        def flaky_send(backend, messages):
+            if 'Второй' in messages[0].body:
+                raise ConnectionError('почтовый сервер недоступен')
+            return send_messages(backend, messages)
+
+        monkeypatch.setattr(EmailBackend, 'send_messages', flaky_send)
+        self.process_outbox()
+        assert sorted(message.body.rsplit(' ', 1)[-1]
+                      for message in mail.outbox) == ['Первый', 'Третий'], (
+            'Проверьте, что письма о комментариях отправляются по одному.'
+        )
+        event = OutboxEvent.objects.get()
+        assert event.event_type == 'comment.created'
+        assert 'почтовый сервер недоступен' in event.last_error, (
+            'Проверьте, что ошибка доставки откладывает только своё событие.'
+        )
+
+        monkeypatch.undo()
+        OutboxEvent.objects.update(available_at=event.created_at)
+        self.process_outbox()
+        assert len(mail.outbox) == 3
+        assert not OutboxEvent.objects.exists()
+
+    def test_04_dead_letter_and_stats(self, admin_client):
+        from reviews import outbox
+        from reviews.models import OutboxEvent
+
+        outbox.enqueue('unknown.event', value=1)
+        self.process_outbox('--max-attempts', '1')
+        event = OutboxEvent.objects.get()
+        assert event.failed, (
+            'Проверьте, что событие помечается недоставленным после '
+            'исчерпания попыток.'
+        )
+        assert outbox.stats() == {
+            'depth': 0, 'failed': 1, 'lag_seconds': 0.0}
+
+        outbox.enqueue('unknown.event', value=2)
+        output = StringIO()
+        call_command('process_outbox', '--stats', stdout=output)
+        assert 'В очереди: 1, не доставлено: 1' in output.getvalue()
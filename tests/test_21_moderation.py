@@ -0,0 +1,92 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21BulkModeration:
+
+    REVIEWS_URL = '/api/v1/moderation/reviews/'
+    COMMENTS_URL = '/api/v1/moderation/comments/'
+
+    def test_01_moderation_permissions(self, client, user_client,
+                                       moderator_client):
+        for url in (self.REVIEWS_URL, self.COMMENTS_URL):
+            response = client.post(url, data={'ids': [1]})
+            assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+                f'Проверьте, что POST-запрос неавторизованного пользователя '
+                f'к `{url}` возвращает ответ со статусом 401.'
+            )
+            response = user_client.post(url, data={'ids': [1]})
+            assert response.status_code == HTTPStatus.FORBIDDEN, (
+                f'Проверьте, что POST-запрос пользователя с ролью `user` к '
+                f'`{url}` возвращает ответ со статусом 403.'
+            )
+            response = moderator_client.post(url, data={})
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что POST-запрос к `{url}` без ids и фильтров '
+                'возвращает ответ со статусом 400.'
+            )
+
+    def test_02_bulk_remove_comments(self, admin_client, admin, user,
+                                     user_client, moderator_client):
+        from reviews.models import Comment, Review
+
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client})
+        review_id = reviews[0]['id']
+        user_comments = [
+            comment['id'] for comment in comments
+            if comment['author'] == user.username]
+
+        response = moderator_client.post(
+            self.COMMENTS_URL, data={'author': user.username},
+            format='json')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {'comments': user_comments}, (
+            f'Проверьте, что `{self.COMMENTS_URL}` возвращает id удалённых '
+            'комментариев.'
+        )
+        assert not Comment.objects.filter(pk__in=user_comments).exists()
+        assert Review.objects.get(pk=review_id).comment_count == (
+            Comment.objects.filter(review_id=review_id).count()), (
+            'Проверьте, что при удалении комментариев набором счётчик '
+            'комментариев отзыва остаётся верным.'
+        )
+        url = (f'/api/v1/titles/{titles[0]["id"]}/reviews/{review_id}/'
+               'comments/')
+        assert admin_client.get(url).json()['count'] == len(comments) - len(
+            user_comments)
+
+    def test_03_bulk_remove_reviews(self, admin_client, admin, user,
+                                    user_client, moderator_client):
+        from reviews.models import Comment, Title
+
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client})
+        title_id = titles[0]['id']
+        create_single_review(moderator_client, title_id, 'Норма', 6)
+        removed = [review['id'] for review in reviews]
+
+        response = moderator_client.post(
+            self.REVIEWS_URL, data={'ids': removed},
+            format='json')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {
+            'reviews': sorted(removed),
+            'comments': sorted(comment['id'] for comment in comments),
+        }, (
+            f'Проверьте, что `{self.REVIEWS_URL}` возвращает id удалённых '
+            'отзывов и их комментариев.'
+        )
+        assert not Comment.objects.exists()
+        title = Title.objects.get(pk=title_id)
+        assert (title.score_sum, title.score_count, title.rating) == (
+            6, 1, 6.0), (
+            'Проверьте, что при удалении отзывов набором рейтинг '
+            'произведения пересчитывается.'
+        )
+        response = admin_client.get(f'/api/v1/titles/{title_id}/')
+        assert response.json()['rating'] == 6
@@ -0,0 +1,102 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_comment, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22UserFeeds:
+
+    USER_REVIEWS_URL_TEMPLATE = '/api/v1/users/{username}/reviews/'
+    USER_COMMENTS_URL_TEMPLATE = '/api/v1/users/{username}/comments/'
+
+    def read_feed(self, client, url, django_assert_max_num_queries):
+        seen = []
+        url = f'{url}?limit=2'
+        while url:
+            with django_assert_max_num_queries(2):
+                response = client.get(url)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+                'статусом 200.'
+            )
+            data = response.json()
+            seen.extend(data['results'])
+            url = data['next']
+        return seen
+
+    def create_activity(self, admin_client, user_client):
+        from reviews.models import Title
+
+        titles = [
+            Title.objects.create(name=f'Произведение {idx}', year=2000)
+            for idx in range(3)
+        ]
+        reviews = []
+        for title in titles:
+            for api_client in (admin_client, user_client):
+                response = create_single_review(
+                    api_client, title.pk, 'Отзыв', 6)
+                reviews.append((response.json()['id'], title))
+        comments = []
+        for review_id, title in reviews:
+            response = create_single_comment(
+                user_client, title.pk, review_id, 'Комментарий')
+            comments.append((response.json()['id'], review_id, title))
+        return reviews[1::2], comments
+
+    def test_01_user_reviews(self, admin_client, user_client, admin, user,
+                             client, django_assert_max_num_queries):
+        user_reviews, _ = self.create_activity(admin_client, user_client)
+        url = self.USER_REVIEWS_URL_TEMPLATE.format(username=user.username)
+
+        seen = self.read_feed(client, url, django_assert_max_num_queries)
+        assert [review['id'] for review in seen] == [
+            review_id for review_id, _ in reversed(user_reviews)
+        ], (
+            f'Проверьте, что `{self.USER_REVIEWS_URL_TEMPLATE}` возвращает '
+            'все отзывы пользователя от новых к старым.'
+        )
+        titles = dict(user_reviews)
+        for review in seen:
+            assert review['author'] == user.username
+            assert review['title'] == {
+                'id': titles[review['id']].pk,
+                'name': titles[review['id']].name,
+            }, (
+                f'Проверьте, что элементы `{self.USER_REVIEWS_URL_TEMPLATE}` '
+                'содержат идентификатор и название произведения.'
+            )
+
+    def test_02_user_comments(self, admin_client, user_client, admin, user,
+                              client, django_assert_max_num_queries):
+        _, comments = self.create_activity(admin_client, user_client)
+        url = self.USER_COMMENTS_URL_TEMPLATE.format(username=user.username)
+
+        seen = self.read_feed(client, url, django_assert_max_num_queries)
+        assert [
+            (comment['id'], comment['review'], comment['title']['id'])
+            for comment in seen
+        ] == [
+            (comment_id, review_id, title.pk)
+            for comment_id, review_id, title in reversed(comments)
+        ], (
+            f'Проверьте, что `{self.USER_COMMENTS_URL_TEMPLATE}` возвращает '
+            'комментарии пользователя с отзывом и произведением.'
+        )
+
+        url = self.USER_COMMENTS_URL_TEMPLATE.format(username=admin.username)
+        assert client.get(url).json()['results'] == []
+
+    def test_03_user_feeds_read_only(self, user_client, client, user):
+        for template in (self.USER_REVIEWS_URL_TEMPLATE,
+                         self.USER_COMMENTS_URL_TEMPLATE):
+            response = client.get(template.format(username='nobody'))
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что `{template}` для несуществующего '
+                'пользователя возвращает ответ со статусом 404.'
+            )
+            response = user_client.post(
+                template.format(username=user.username), data={'text': 'x'})
+            assert response.status_code == HTTPStatus.METHOD_NOT_ALLOWED
@@ -0,0 +1,103 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_comments, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23SoftDelete:
+
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+    COMMENT_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/{comment_id}/'
+    )
+
+    def test_01_review_soft_delete(self, admin_client, admin, user,
+                                   user_client):
+        from reviews.models import Comment, Review, Title
+
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client})
+        title_id = titles[0]['id']
+        review_id = reviews[0]['id']
+        url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review_id)
+
+        response = admin_client.delete(url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert Review.all_objects.get(pk=review_id).deleted_at, (
+            'Проверьте, что удаление отзыва только помечает его удалённым.'
+        )
+        assert Comment.all_objects.filter(review_id=review_id).count() == (
+            len(comments))
+        assert not Review.objects.filter(pk=review_id).exists(), (
+            'Проверьте, что менеджер по умолчанию не возвращает удалённые '
+            'отзывы.'
+        )
+        assert not Comment.objects.filter(review_id=review_id).exists(), (
+            'Проверьте, что комментарии удалённого отзыва скрываются вместе '
+            'с ним.'
+        )
+        assert admin_client.get(url).status_code == HTTPStatus.NOT_FOUND
+        title = Title.objects.get(pk=title_id)
+        assert (title.score_count, title.rating) == (1, 5.0), (
+            'Проверьте, что рейтинг произведения пересчитывается в момент '
+            'удаления отзыва.'
+        )
+
+        response = create_single_review(admin_client, title_id, 'Снова', 9)
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что автор может снова оставить отзыв на произведение '
+            'после удаления прежнего.'
+        )
+
+    def test_02_comment_soft_delete(self, admin_client, admin, user,
+                                    user_client):
+        from reviews.models import Comment, Review
+
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client})
+        response = user_client.delete(self.COMMENT_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id'],
+            comment_id=comments[1]['id']))
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert Comment.all_objects.filter(pk=comments[1]['id']).exists()
+        assert Review.objects.get(pk=reviews[0]['id']).comment_count == 1
+
+        user.delete()
+        assert Review.objects.get(pk=reviews[0]['id']).comment_count == 1, (
+            'Проверьте, что удалённые ранее комментарии не вычитаются из '
+            'счётчика повторно при каскадном удалении.'
+        )
+
+    def test_03_purge_deleted(self, admin_client, admin, user, user_client):
+        from reviews.models import Comment, Review, Title
+
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client})
+        for review in Review.objects.all():
+            review.delete()
+
+        call_command('purge_deleted', '--older-than', '60',
+                     stdout=StringIO())
+        assert Review.all_objects.count() == len(reviews), (
+            'Проверьте, что `--older-than` оставляет недавно удалённые '
+            'объекты.'
+        )
+
+        out = StringIO()
+        call_command('purge_deleted', '--batch-size', '1', stdout=out)
+        assert 'отзывы - 2, комментарии - 2' in out.getvalue()
+        assert not Review.all_objects.exists()
+        assert not Comment.all_objects.exists()
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.score_count, title.rating) == (
+            0, 0, None), (
+            'Проверьте, что окончательное удаление не меняет рейтинг '
+            'повторно.'
+        )
@@ -0,0 +1,183 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_comments, create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24DeferredDeletion:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    DELETIONS_URL = '/api/v1/deletions/'
+
+    @pytest.fixture(autouse=True)
+    def small_batches(self, monkeypatch):
+        from reviews import deletion
+
+        monkeypatch.setattr(deletion, 'BATCH_SIZE', 1)
+
+    def process_outbox(self):
+        call_command('process_outbox', '--once', stdout=StringIO())
+
+    def test_01_title_deleted_in_background(self, admin_client, admin, user,
+                                            user_client):
+        from reviews.models import Comment, GenreTitle, Review, Title
+
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client})
+        title_id = titles[0]['id']
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+
+        response = admin_client.delete(url)
+        assert response.status_code == HTTPStatus.ACCEPTED
+        job = response.json()
+        assert (job['status'], job['object_id']) == ('pending', title_id), (
+            'Проверьте, что DELETE-запрос к '
+            f'`{self.TITLE_DETAIL_URL_TEMPLATE}` возвращает задание на '
+            'удаление.'
+        )
+        assert response['Location'].endswith(
+            f'{self.DELETIONS_URL}{job["id"]}/')
+        assert admin_client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что удаляемое произведение сразу скрывается.'
+        )
+        assert Review.all_objects.filter(title_id=title_id).count() == len(
+            reviews), (
+            'Проверьте, что зависимые объекты удаляются не в запросе, а '
+            'фоновым обработчиком.'
+        )
+
+        self.process_outbox()
+        assert not Title.all_objects.filter(pk=title_id).exists()
+        assert not Review.all_objects.filter(title_id=title_id).exists()
+        assert not Comment.all_objects.exists()
+        assert not GenreTitle.objects.filter(title_id=title_id).exists()
+
+        response = admin_client.get(response['Location'])
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['status'] == 'done'
+        assert response.json()['processed'] >= len(comments) + len(reviews), (
+            'Проверьте, что задание учитывает число обработанных строк.'
+        )
+
+    def test_02_user_deleted_in_background(self, admin_client, admin, user,
+                                           user_client, django_user_model):
+        from reviews.models import Review, Title
+
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client})
+        create_single_review(user_client, titles[1]['id'], 'Плохо', 1)
+
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.ACCEPTED
+        response = admin_client.get(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        for url in (f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+                    '/api/v1/reviews/latest/'):
+            authors = {item['author'] for item in admin_client.get(
+                url).json()['results']}
+            assert user.username not in authors, (
+                f'Проверьте, что `{url}` сразу скрывает отзывы удаляемого '
+                'пользователя.'
+            )
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_count, title.rating) == (1, 5.0), (
+            'Проверьте, что отзывы удаляемого пользователя сразу перестают '
+            'учитываться в рейтинге.'
+        )
+
+        self.process_outbox()
+        assert not django_user_model.objects.filter(pk=user.pk).exists()
+        assert not Review.all_objects.filter(author_id=user.pk).exists()
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_count, title.rating) == (1, 5.0), (
+            'Проверьте, что после удаления пользователя рейтинг произведений '
+            'пересчитывается.'
+        )
+        assert Title.objects.get(pk=titles[1]['id']).rating is None
+        assert Review.objects.get(pk=reviews[0]['id']).comment_count == 1
+
+    def test_03_genre_and_category_deleted_in_background(self, admin_client):
+        from reviews.models import Category, Genre, GenreTitle, Title
+
+        titles, categories, genres = create_titles(admin_client)
+        genre = Genre.objects.get(slug=genres[0]['slug'])
+        response = admin_client.delete(f'/api/v1/genres/{genre.slug}/')
+        assert response.status_code == HTTPStatus.ACCEPTED
+        slugs = {item['slug'] for item in admin_client.get(
+            '/api/v1/genres/').json()['results']}
+        assert genre.slug not in slugs
+        response = admin_client.get('/api/v1/titles/', {'genre': genre.slug})
+        assert response.json()['count'] == 0, (
+            'Проверьте, что фильтр по удаляемому жанру ничего не находит.'
+        )
+        response = admin_client.post(
+            '/api/v1/genres/', data={'name': 'Новый', 'slug': genre.slug})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что slug удаляемого жанра нельзя занять, пока '
+            'удаление не завершено.'
+        )
+
+        category = Category.objects.get(slug=categories[0]['slug'])
+        response = admin_client.delete(f'/api/v1/categories/{category.slug}/')
+        assert response.status_code == HTTPStatus.ACCEPTED
+        response = admin_client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id']))
+        assert response.json()['category'] is None, (
+            'Проверьте, что удаляемая категория сразу пропадает из ответов '
+            'произведений.'
+        )
+        response = admin_client.get(
+            '/api/v1/titles/', {'category': category.slug})
+        assert response.json()['count'] == 0, (
+            'Проверьте, что фильтр по удаляемой категории ничего не находит.'
+        )
+        response = admin_client.post(
+            '/api/v1/categories/',
+            data={'name': 'Новая', 'slug': category.slug})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что slug удаляемой категории нельзя занять, пока '
+            'удаление не завершено.'
+        )
+
+        self.process_outbox()
+        assert not Genre.all_objects.filter(pk=genre.pk).exists()
+        assert not GenreTitle.objects.filter(genre_id=genre.pk).exists()
+        assert not Category.all_objects.filter(pk=category.pk).exists()
+        response = admin_client.post(
+            '/api/v1/categories/',
+            data={'name': 'Новая', 'slug': category.slug})
+        assert response.status_code == HTTPStatus.CREATED
+        assert Title.objects.count() == len(titles), (
+            'Проверьте, что удаление категории не удаляет произведения.'
+        )
+
+    def test_04_comments_of_hidden_title(self, admin_client, admin):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client})
+        url = (f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+               f'{reviews[0]["id"]}/comments/')
+        response = admin_client.delete(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id']))
+        assert response.status_code == HTTPStatus.ACCEPTED
+
+        assert admin_client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарии к отзывам скрытого произведения '
+            'недоступны.'
+        )
+        response = admin_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что к отзывам скрытого произведения нельзя добавить '
+            'комментарий.'
+        )
+
+    def test_05_deletions_admin_only(self, user_client, moderator_client):
+        for api_client in (user_client, moderator_client):
+            response = api_client.get(self.DELETIONS_URL)
+            assert response.status_code == HTTPStatus.FORBIDDEN, (
+                f'Проверьте, что `{self.DELETIONS_URL}` доступен только '
+                'администратору.'
+            )
@@ -0,0 +1,95 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25ConfirmationQueue:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+    DEAD_LETTERS_URL = '/api/v1/outbox/dead-letters/'
+
+    def send_queued(self, *args):
+        call_command('process_outbox', '--once', '--event-type',
+                     'confirmation.requested', *args, stdout=StringIO())
+
+    def test_01_signup_queues_confirmation(self, client, monkeypatch):
+        from django.core.mail.backends.locmem import EmailBackend
+
+        connections = []
+        original_open = EmailBackend.open
+
+        def counting_open(backend):
+            connections.append(backend)
+            return original_open(backend)
+
+        monkeypatch.setattr(EmailBackend, 'open', counting_open)
+        signups = [
+            {'email': f'signup{idx}@yamdb.fake', 'username': f'signup{idx}'}
+            for idx in range(3)
+        ]
+        for data in signups:
+            response = client.post(self.URL_SIGNUP, data=data)
+            assert response.status_code == HTTPStatus.OK
+        client.post(self.URL_SIGNUP, data=signups[0])
+        assert not mail.outbox, (
+            f'Проверьте, что `{self.URL_SIGNUP}` не отправляет письмо в '
+            'запросе, а ставит его в очередь.'
+        )
+
+        self.send_queued()
+        assert sorted(message.to[0] for message in mail.outbox) == sorted(
+            data['email'] for data in signups), (
+            'Проверьте, что обработчик очереди отправляет по одному письму '
+            'каждому пользователю.'
+        )
+        assert len(connections) == 1, (
+            'Проверьте, что письма пачки отправляются через одно соединение.'
+        )
+
+        code = mail.outbox[0].body.rsplit(' ', 1)[-1]
+        username = {
+            data['email']: data['username'] for data in signups
+        }[mail.outbox[0].to[0]]
+        response = client.post(self.URL_TOKEN, data={
+            'username': username, 'confirmation_code': code})
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что код из письма позволяет получить токен.'
+        )
+
+    def test_02_dead_letters(self, client, admin_client, user_client,
+                             monkeypatch):
+        from django.core.mail.backends.locmem import EmailBackend
+
+        def broken_send(backend, messages):
+            raise ConnectionError('почтовый сервер недоступен')
+
+        monkeypatch.setattr(EmailBackend, 'send_messages', broken_send)
+        client.post(self.URL_SIGNUP, data={
+            'email': 'late@yamdb.fake', 'username': 'late'})
+        self.send_queued('--max-attempts', '1')
+
+        assert user_client.get(self.DEAD_LETTERS_URL).status_code == (
+            HTTPStatus.FORBIDDEN)
+        response = admin_client.get(
+            self.DEAD_LETTERS_URL, {'event_type': 'confirmation.requested'})
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()['results']
+        assert len(results) == 1, (
+            f'Проверьте, что `{self.DEAD_LETTERS_URL}` показывает события, '
+            'не доставленные после всех попыток.'
+        )
+        assert 'почтовый сервер недоступен' in results[0]['last_error']
+
+        monkeypatch.undo()
+        response = admin_client.post(
+            f'{self.DEAD_LETTERS_URL}{results[0]["id"]}/retry/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['failed'] is False
+        self.send_queued()
+        assert [message.to for message in mail.outbox] == [
+            ['late@yamdb.fake']]
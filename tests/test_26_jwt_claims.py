@@ -0,0 +1,103 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from rest_framework.test import APIClient, APIRequestFactory
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26JWTClaims:
+
+    URL_TOKEN = '/api/v1/auth/token/'
+    USERS_URL = '/api/v1/users/'
+    ME_URL = '/api/v1/users/me/'
+
+    def obtain_token(self, client, user):
+        response = client.post(self.URL_TOKEN, data={
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user),
+        })
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['token']
+
+    def authenticate(self, token):
+        from api.authentication import CachedJWTAuthentication
+
+        request = APIRequestFactory().get(
+            self.USERS_URL, HTTP_AUTHORIZATION=f'Bearer {token}')
+        return CachedJWTAuthentication().authenticate(request)
+
+    def api_client(self, token):
+        api_client = APIClient()
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return api_client
+
+    def test_01_token_claims(self, client, admin,
+                             django_assert_num_queries):
+        token = self.obtain_token(client, admin)
+        self.authenticate(token)
+        with django_assert_num_queries(0):
+            user, validated_token = self.authenticate(token)
+        assert (validated_token['username'], validated_token['role']) == (
+            admin.username, admin.role), (
+            f'Проверьте, что токен от `{self.URL_TOKEN}` содержит имя и роль '
+            'пользователя.'
+        )
+        assert (user.pk, user.username, user.is_admin) == (
+            admin.pk, admin.username, True), (
+            'Проверьте, что пользователь собирается из утверждений токена '
+            'без запроса к базе данных.'
+        )
+
+    def test_02_user_cache(self, admin, token_admin,
+                           django_assert_num_queries):
+        from api.authentication import user_cache
+
+        self.authenticate(token_admin['access'])
+        user_cache.clear()
+        with django_assert_num_queries(1):
+            self.authenticate(token_admin['access'])
+        with django_assert_num_queries(0):
+            user, _ = self.authenticate(token_admin['access'])
+        assert user.pk == admin.pk, (
+            'Проверьте, что пользователь токена без утверждений о роли '
+            'кэшируется в памяти процесса.'
+        )
+
+    def test_03_role_change_invalidates(self, client, admin_client, user):
+        user_client = self.api_client(self.obtain_token(client, user))
+        assert user_client.get(self.USERS_URL).status_code == (
+            HTTPStatus.FORBIDDEN)
+
+        url = f'{self.USERS_URL}{user.username}/'
+        admin_client.patch(url, data={'role': 'admin'})
+        assert user_client.get(self.USERS_URL).status_code == HTTPStatus.OK, (
+            'Проверьте, что смена роли через `/api/v1/users/{username}/` '
+            'сразу применяется к выданным токенам.'
+        )
+        admin_client.patch(url, data={'role': 'user'})
+        assert user_client.get(self.USERS_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED), (
+            'Проверьте, что роль из токена не используется после её смены.'
+        )
+
+    def test_04_deleted_user_rejected(self, client, admin_client, user):
+        user_client = self.api_client(self.obtain_token(client, user))
+        admin_client.delete(f'{self.USERS_URL}{user.username}/')
+        assert user_client.get(self.ME_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED), (
+            'Проверьте, что токен удалённого пользователя отклоняется.'
+        )
+
+    def test_05_me_full_profile(self, client, user):
+        user_client = self.api_client(self.obtain_token(client, user))
+        response = user_client.get(self.ME_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert (response.json()['email'], response.json()['bio']) == (
+            user.email, user.bio), (
+            f'Проверьте, что `{self.ME_URL}` возвращает все поля профиля.'
+        )
+        response = user_client.patch(self.ME_URL, data={'bio': 'Новое'})
+        assert response.json()['email'] == user.email
+        user.refresh_from_db()
+        assert (user.bio, user.first_name) == ('Новое', '')
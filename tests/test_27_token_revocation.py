@@ -0,0 +1,146 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27TokenRevocation:
+
+    URL_TOKEN = '/api/v1/auth/token/'
+    URL_LOGOUT = '/api/v1/auth/logout/'
+    USERS_URL = '/api/v1/users/'
+    ME_URL = '/api/v1/users/me/'
+
+    def obtain_token(self, client, user):
+        response = client.post(self.URL_TOKEN, data={
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user),
+        })
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['token']
+
+    def api_client(self, token):
+        api_client = APIClient()
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return api_client
+
+    def test_01_logout(self, client, user, user_client):
+        api_client = self.api_client(self.obtain_token(client, user))
+        assert api_client.get(self.ME_URL).status_code == HTTPStatus.OK
+
+        response = api_client.post(self.URL_LOGOUT)
+        assert response.status_code == HTTPStatus.NO_CONTENT, (
+            f'Проверьте, что POST-запрос к `{self.URL_LOGOUT}` возвращает '
+            'ответ со статусом 204.'
+        )
+        assert api_client.get(self.ME_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED), (
+            f'Проверьте, что после `{self.URL_LOGOUT}` токен отклоняется.'
+        )
+        assert user_client.get(self.ME_URL).status_code == HTTPStatus.OK, (
+            'Проверьте, что выход отзывает только токен запроса.'
+        )
+        user_client.post(self.URL_LOGOUT)
+        assert user_client.get(self.ME_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED)
+
+    def test_02_no_queries_for_valid_tokens(self, client, admin, user,
+                                            django_assert_num_queries):
+        from api.authentication import CachedJWTAuthentication
+
+        self.api_client(self.obtain_token(client, user)).post(
+            self.URL_LOGOUT)
+        request = APIRequestFactory().get(
+            self.USERS_URL, HTTP_AUTHORIZATION='Bearer {}'.format(
+                self.obtain_token(client, admin)))
+        CachedJWTAuthentication().authenticate(request)
+        with django_assert_num_queries(0):
+            user, _ = CachedJWTAuthentication().authenticate(request)
+        assert user.pk == admin.pk, (
+            'Проверьте, что проверка неотозванного токена не обращается к '
+            'базе данных.'
+        )
+
+    def test_03_role_downgrade(self, client, admin_client, moderator):
+        url = f'{self.USERS_URL}{moderator.username}/'
+        api_client = self.api_client(self.obtain_token(client, moderator))
+        admin_client.patch(url, data={'role': 'admin'})
+        assert api_client.get(self.ME_URL).status_code == HTTPStatus.OK, (
+            'Проверьте, что повышение роли не отзывает токены.'
+        )
+        admin_client.patch(url, data={'role': 'user'})
+        assert api_client.get(self.ME_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED), (
+            'Проверьте, что понижение роли отзывает токены пользователя.'
+        )
+
+    def test_04_user_deletion(self, client, admin_client, user):
+        from reviews.models import IssuedToken
+
+        self.obtain_token(client, user)
+        admin_client.delete(f'{self.USERS_URL}{user.username}/')
+        assert not IssuedToken.objects.filter(
+            user=user, revoked_at__isnull=True).exists(), (
+            'Проверьте, что удаление пользователя отзывает его токены.'
+        )
+
+    def test_05_purge_expired(self, client, user):
+        from reviews.models import IssuedToken
+
+        self.obtain_token(client, user)
+        IssuedToken.objects.filter(pk=IssuedToken.objects.first().pk).update(
+            expires_at=timezone.now() - timedelta(minutes=1))
+        out = StringIO()
+        call_command('purge_deleted', stdout=out)
+        assert 'токены - 1' in out.getvalue()
+        assert IssuedToken.objects.count() == 1, (
+            'Проверьте, что `purge_deleted` удаляет только истёкшие токены.'
+        )
+
+    def test_06_incremental_load(self, client, user, admin):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from api.revocation import revoked_tokens
+
+        self.api_client(self.obtain_token(client, user)).post(
+            self.URL_LOGOUT)
+        bloom = revoked_tokens.load()
+        self.api_client(self.obtain_token(client, admin)).post(
+            self.URL_LOGOUT)
+        with CaptureQueriesContext(connection) as context:
+            assert revoked_tokens.load() is bloom, (
+                'Проверьте, что после отзыва токена фильтр дополняется, а '
+                'не строится заново.'
+            )
+        assert len(context.captured_queries) == 1
+        assert '"revoked_at" >=' in context.captured_queries[0]['sql'], (
+            'Проверьте, что догружаются только недавно отозванные токены.'
+        )
+        assert bloom.count == 2
+
+
+def test_bloom_filter():
+    from api.revocation import BloomFilter
+
+    items = [f'jti-{idx}' for idx in range(1000)]
+    bloom = BloomFilter(items)
+    assert all(item in bloom for item in items), (
+        'Проверьте, что фильтр Блума не даёт ложноотрицательных ответов.'
+    )
+    false_positives = sum(f'other-{idx}' in bloom for idx in range(10000))
+    assert false_positives < 300
+    assert 'jti-0' not in BloomFilter()
+
+    bloom = BloomFilter(capacity=2)
+    for item in ('jti-0', 'jti-0', 'jti-1'):
+        bloom.add(item)
+    assert (bloom.count, bloom.full) == (2, False)
+    bloom.add('jti-2')
+    assert bloom.full
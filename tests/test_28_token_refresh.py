@@ -0,0 +1,134 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.core import mail
+from rest_framework.test import APIClient
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28TokenRefresh:
+
+    URL_TOKEN = '/api/v1/auth/token/'
+    URL_REFRESH = '/api/v1/auth/token/refresh/'
+    URL_LOGOUT = '/api/v1/auth/logout/'
+    ME_URL = '/api/v1/users/me/'
+
+    def obtain_tokens(self, client, user):
+        response = client.post(self.URL_TOKEN, data={
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user),
+        })
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'refresh' in data, (
+            f'Проверьте, что `{self.URL_TOKEN}` возвращает refresh-токен.'
+        )
+        return data
+
+    def api_client(self, token):
+        api_client = APIClient()
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return api_client
+
+    def test_01_refresh(self, client, user, django_assert_max_num_queries):
+        from reviews.models import OutboxEvent
+
+        tokens = self.obtain_tokens(client, user)
+        outbox_count = OutboxEvent.objects.count()
+        mail_count = len(mail.outbox)
+        with django_assert_max_num_queries(5):
+            response = client.post(
+                self.URL_REFRESH, data={'refresh': tokens['refresh']})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что POST-запрос к `{self.URL_REFRESH}` с '
+            'refresh-токеном возвращает ответ со статусом 200.'
+        )
+        data = response.json()
+        assert data['refresh'] != tokens['refresh'], (
+            f'Проверьте, что `{self.URL_REFRESH}` выдаёт новый '
+            'refresh-токен.'
+        )
+        response = self.api_client(data['token']).get(self.ME_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['username'] == user.username
+        assert (OutboxEvent.objects.count(), len(mail.outbox)) == (
+            outbox_count, mail_count), (
+            'Проверьте, что обновление токена не отправляет писем.'
+        )
+
+    def test_02_rotation(self, client, user):
+        tokens = self.obtain_tokens(client, user)
+        rotated = client.post(
+            self.URL_REFRESH, data={'refresh': tokens['refresh']}).json()
+        response = client.post(
+            self.URL_REFRESH, data={'refresh': tokens['refresh']})
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что использованный refresh-токен повторно не '
+            'принимается.'
+        )
+        response = self.api_client(rotated['token']).get(self.ME_URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что повторное использование refresh-токена отзывает '
+            'все токены пользователя.'
+        )
+        response = client.post(
+            self.URL_REFRESH, data={'refresh': rotated['refresh']})
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_03_invalid_refresh(self, client, user):
+        tokens = self.obtain_tokens(client, user)
+        assert client.post(self.URL_REFRESH).status_code == (
+            HTTPStatus.BAD_REQUEST)
+        for token in ('invalid', tokens['token']):
+            response = client.post(self.URL_REFRESH, data={'refresh': token})
+            assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+                f'Проверьте, что `{self.URL_REFRESH}` отклоняет '
+                'недействительный токен и токен доступа.'
+            )
+
+    def test_04_refresh_revoked(self, client, admin_client, moderator):
+        tokens = self.obtain_tokens(client, moderator)
+        admin_client.patch(f'/api/v1/users/{moderator.username}/',
+                           data={'role': 'user'})
+        response = client.post(
+            self.URL_REFRESH, data={'refresh': tokens['refresh']})
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что понижение роли отзывает и refresh-токены.'
+        )
+
+        tokens = self.obtain_tokens(client, moderator)
+        response = self.api_client(tokens['token']).post(
+            self.URL_LOGOUT, data={'refresh': tokens['refresh']})
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        response = client.post(
+            self.URL_REFRESH, data={'refresh': tokens['refresh']})
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            f'Проверьте, что `{self.URL_LOGOUT}` отзывает переданный '
+            'refresh-токен.'
+        )
+
+    def test_05_refresh_picks_up_role(self, client, admin_client, user):
+        tokens = self.obtain_tokens(client, user)
+        admin_client.patch(f'/api/v1/users/{user.username}/',
+                           data={'role': 'moderator'})
+        response = client.post(
+            self.URL_REFRESH, data={'refresh': tokens['refresh']})
+        assert response.status_code == HTTPStatus.OK
+        response = self.api_client(response.json()['token']).get(self.ME_URL)
+        assert response.json()['role'] == 'moderator', (
+            'Проверьте, что новый токен содержит текущую роль пользователя.'
+        )
+
+    def test_06_logout_validates_refresh_first(self, client, user):
+        tokens = self.obtain_tokens(client, user)
+        api_client = self.api_client(tokens['token'])
+        response = api_client.post(self.URL_LOGOUT, data={'refresh': 'bad'})
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        assert api_client.get(self.ME_URL).status_code == HTTPStatus.OK, (
+            f'Проверьте, что `{self.URL_LOGOUT}` с неверным refresh-токеном '
+            'не отзывает токен доступа.'
+        )
+        response = api_client.post(
+            self.URL_LOGOUT, data={'refresh': tokens['refresh']})
+        assert response.status_code == HTTPStatus.NO_CONTENT
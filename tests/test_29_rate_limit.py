@@ -0,0 +1,132 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_comment, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29RateLimit:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        from api.throttling import TokenBucketThrottle
+
+        now = [1000.0]
+        monkeypatch.setattr(TokenBucketThrottle, 'timer', lambda self: now[0])
+        return now
+
+    def set_rate(self, monkeypatch, throttle, rate):
+        monkeypatch.setattr(throttle, 'rate', rate, raising=False)
+
+    def signup(self, client, username):
+        return client.post(self.URL_SIGNUP, data={
+            'username': username, 'email': f'{username}@yamdb.fake'})
+
+    def test_01_auth_username_bucket(self, client, clock, monkeypatch):
+        from api.throttling import AuthUsernameThrottle
+
+        self.set_rate(monkeypatch, AuthUsernameThrottle, '2/min')
+        for _ in range(2):
+            assert self.signup(client, 'limited').status_code == HTTPStatus.OK
+        response = self.signup(client, 'limited')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Проверьте, что частые запросы к `{self.URL_SIGNUP}` с одним '
+            'username возвращают ответ со статусом 429.'
+        )
+        assert int(response['Retry-After']) == 30, (
+            'Проверьте, что ответ 429 содержит заголовок `Retry-After`.'
+        )
+        response = client.post(self.URL_TOKEN, data={
+            'username': 'limited', 'confirmation_code': 'x'})
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Проверьте, что `{self.URL_TOKEN}` делит бюджет с '
+            f'`{self.URL_SIGNUP}`.'
+        )
+        assert self.signup(client, 'other').status_code == HTTPStatus.OK
+
+        clock[0] += 30
+        assert self.signup(client, 'limited').status_code == HTTPStatus.OK, (
+            'Проверьте, что корзина пополняется со временем.'
+        )
+
+    def test_02_auth_ip_bucket(self, client, clock, monkeypatch):
+        from api.throttling import AuthIPThrottle
+
+        self.set_rate(monkeypatch, AuthIPThrottle, '3/min')
+        for idx in range(3):
+            assert self.signup(client, f'user{idx}').status_code == (
+                HTTPStatus.OK)
+        assert self.signup(client, 'user3').status_code == (
+            HTTPStatus.TOO_MANY_REQUESTS), (
+            f'Проверьте, что `{self.URL_SIGNUP}` ограничивает число запросов '
+            'с одного IP-адреса.'
+        )
+        response = client.post(
+            self.URL_SIGNUP, HTTP_X_FORWARDED_FOR='10.0.0.2',
+            data={'username': 'user3', 'email': 'user3@yamdb.fake'})
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что подделанный заголовок `X-Forwarded-For` не '
+            'обходит ограничение по IP-адресу.'
+        )
+        response = client.post(
+            self.URL_SIGNUP, REMOTE_ADDR='10.0.0.1',
+            data={'username': 'user3', 'email': 'user3@yamdb.fake'})
+        assert response.status_code == HTTPStatus.OK
+
+    def test_03_review_and_comment_budgets(self, admin_client, user_client,
+                                           clock, monkeypatch):
+        from api.throttling import (CommentUsernameThrottle,
+                                    ReviewUsernameThrottle)
+        from reviews.models import Title
+
+        self.set_rate(monkeypatch, ReviewUsernameThrottle, '1/min')
+        self.set_rate(monkeypatch, CommentUsernameThrottle, '1/min')
+        titles = [
+            Title.objects.create(name=f'Произведение {idx}', year=2000)
+            for idx in range(2)
+        ]
+        review_id = create_single_review(
+            user_client, titles[0].pk, 'Да', 5).json()['id']
+        response = user_client.post(
+            f'/api/v1/titles/{titles[1].pk}/reviews/',
+            data={'text': 'Да', 'score': 5})
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что частые POST-запросы отзывов возвращают ответ со '
+            'статусом 429.'
+        )
+        create_single_review(admin_client, titles[1].pk, 'Да', 5)
+        url = f'/api/v1/titles/{titles[0].pk}/reviews/'
+        for _ in range(3):
+            assert user_client.get(url).status_code == HTTPStatus.OK, (
+                'Проверьте, что ограничение не действует на GET-запросы.'
+            )
+
+        # У комментариев отдельный бюджет запросов.
+        create_single_comment(user_client, titles[0].pk, review_id, 'Первый')
+        response = user_client.post(f'{url}{review_id}/comments/',
+                                    data={'text': 'Второй'})
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+
+    def test_04_rejection_does_not_insert(self, client, clock, monkeypatch):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from api.throttling import AuthUsernameThrottle
+
+        self.set_rate(monkeypatch, AuthUsernameThrottle, '1/min')
+        assert self.signup(client, 'limited').status_code == HTTPStatus.OK
+        with CaptureQueriesContext(connection) as context:
+            response = self.signup(client, 'limited')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        statements = [
+            query['sql'].split(None, 1)[0].upper()
+            for query in context.captured_queries
+        ]
+        assert 'INSERT' not in statements and 'BEGIN' not in statements, (
+            'Проверьте, что отклонённый запрос не создаёт корзину заново и '
+            f'не открывает транзакцию записи. Запросы: {statements}'
+        )
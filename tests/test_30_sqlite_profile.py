@@ -0,0 +1,41 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+
+@pytest.mark.django_db
+class Test30SQLiteProfile:
+
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_01_pragmas_applied(self, settings):
+        assert settings.DATABASES['default']['CONN_MAX_AGE'], (
+            'Проверьте, что соединения с базой данных переиспользуются.'
+        )
+        expected = {
+            'synchronous': 1,
+            'temp_store': 2,
+            'busy_timeout': settings.SQLITE_PRAGMAS['busy_timeout'],
+            'cache_size': settings.SQLITE_PRAGMAS['cache_size'],
+        }
+        assert {name: self.pragma(name) for name in expected} == expected, (
+            'Проверьте, что профиль `SQLITE_PRAGMAS` применяется к каждому '
+            'новому соединению.'
+        )
+
+    def test_02_benchmark(self):
+        out = StringIO()
+        call_command(
+            'benchmark_sqlite', '--titles', '20', '--reviews', '100',
+            '--readers', '1', '--writers', '1', '--duration', '0.2',
+            stdout=out)
+        profiles = [line.split()[0] for line in out.getvalue().splitlines()]
+        assert profiles[1:] == ['default', 'tuned'], (
+            'Проверьте, что `benchmark_sqlite` сравнивает профили `default` '
+            'и `tuned`.'
+        )